@@ -22,12 +22,27 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import array
+import hashlib
+import mmap
+import operator
 import struct
 import os
 import sys
+import threading
+import time
 import zlib
 
-from math import fmod
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+from math import floor, fmod
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 # Debug stuff
@@ -96,46 +111,509 @@ ChannelFlags = {
     MF_POINTCLOUD_INFO_CHANNEL : 'MF_POINTCLOUD_INFO_CHANNEL',
 }
 
+#
+# Mesh data output types
+#
+OUTPUT_TUPLE  = 'TUPLE'   # Tuple of tuples (default)
+OUTPUT_ARRAY  = 'ARRAY'   # (N,3) NumPy array over the channel buffer
+OUTPUT_BUFFER = 'BUFFER'  # Flat typed memoryview over the channel buffer
+
+OutputTypes = {
+    OUTPUT_TUPLE,
+    OUTPUT_ARRAY,
+    OUTPUT_BUFFER,
+}
+
+
+#
+# Animation types, as accepted by MeshFile.getFrameByType()
+#
+ANIM_LOOP     = 0
+ANIM_ONCE     = 1
+ANIM_PINGPONG = 2
+ANIM_STILL    = 3
+
+AnimTypes = {
+    '0'        : ANIM_LOOP,
+    'LOOP'     : ANIM_LOOP,
+    '1'        : ANIM_ONCE,
+    'ONCE'     : ANIM_ONCE,
+    '2'        : ANIM_PINGPONG,
+    'PINGPONG' : ANIM_PINGPONG,
+    '3'        : ANIM_STILL,
+    'STILL'    : ANIM_STILL,
+}
+
+
+def _requireNumpy(what):
+    if numpy is None:
+        raise ImportError("NumPy is required for %s" % what)
+
+
+# Vectorized MeshFile.getFrameByType(): maps an array of scene frames to
+# file frame indices. All arguments are broadcast against each other, so
+# per proxy parameters can be passed as arrays (e.g. shaped (P,1) against
+# (F,) scene frames for a (P,F) result). animType values are looked up in
+# AnimTypes like the scalar version does; unknown types pass frames through.
+#
+def getFramesByType(animType, animOffset, speed, frames, animLength):
+    _requireNumpy("getFramesByType")
+
+    # Object arrays keep mixed lists like [0, 'LOOP'] as they are, plain
+    # asarray() would turn the int into the string '0'
+    animTypes = numpy.asarray(animType, dtype=object)
+    typeCodes = numpy.array([AnimTypes.get(t, -1) for t in animTypes.ravel().tolist()], dtype=numpy.int8).reshape(animTypes.shape)
+
+    typeCodes, animOffset, speed, frames, animLength = numpy.broadcast_arrays(
+        typeCodes,
+        numpy.asarray(animOffset, dtype=numpy.float64),
+        numpy.asarray(speed,      dtype=numpy.float64),
+        numpy.asarray(frames,     dtype=numpy.float64),
+        numpy.asarray(animLength, dtype=numpy.float64),
+    )
+
+    animStart = 0
+
+    value = animOffset + (frames - animStart) * speed
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        loopFrames = numpy.fmod(value, animLength)
+        loopFrames = numpy.where(loopFrames < 0, loopFrames + animLength, loopFrames) + animStart
+
+        onceFrames = numpy.maximum(numpy.minimum(value, animLength - 1), 0.0) + animStart
+
+        pingPongLength = animLength*2-2 # subtract 2 to remove the duplicate frames
+        pingPongFrames = numpy.fmod(value, pingPongLength)
+        pingPongFrames = numpy.where(pingPongFrames < 0, pingPongFrames + pingPongLength, pingPongFrames)
+        pingPongFrames = numpy.where(pingPongFrames >= animLength, pingPongLength - pingPongFrames, pingPongFrames)
+        pingPongFrames = pingPongFrames + animStart*speed
+
+        stillFrames = numpy.maximum(numpy.minimum(animOffset + animStart, animLength - 1.0), 0.0)
+
+    result = numpy.select(
+        [typeCodes == ANIM_LOOP, typeCodes == ANIM_ONCE, typeCodes == ANIM_PINGPONG, typeCodes == ANIM_STILL],
+        [loopFrames, onceFrames, pingPongFrames, stillFrames],
+        default=frames,
+    )
+
+    # Degenerate animation lengths (where the scalar version fails in fmod)
+    result = numpy.where(numpy.isfinite(result), result, 0.0)
+
+    return result.astype(numpy.int64)
+
+
+
+class ChecksumError(ValueError):
+    pass
+
+
+# Per element CRC32 checksums of a channel
+#
+def _computeChecksums(data, elementSize, numElements):
+    view = memoryview(data).cast('B')
+    return array.array('I', (zlib.crc32(view[i*elementSize:(i+1)*elementSize]) for i in range(numElements)))
+
+
+def getChannelName(channelID):
+    if channelID in ChannelID:
+        return ChannelID[channelID]
+    if channelID >= VERT_TEX_TOPO_CHANNEL0:
+        return "VERT_TEX_TOPO_CHANNEL%i" % (channelID - VERT_TEX_TOPO_CHANNEL0)
+    if channelID >= VERT_TEX_CHANNEL0:
+        return "VERT_TEX_CHANNEL%i" % (channelID - VERT_TEX_CHANNEL0)
+    if channelID >= POINTCLOUD_GEOM_CHANNEL:
+        return "POINTCLOUD_GEOM_CHANNEL%i" % (channelID - POINTCLOUD_GEOM_CHANNEL)
+    return str(channelID)
+
+
+
+# Read call and byte counters of a file
+#
+class IOStats(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def add(self, size):
+        with self.lock:
+            self.readCalls += 1
+            self.bytesRead += size
+
+    def reset(self):
+        with self.lock:
+            self.readCalls = 0
+            self.bytesRead = 0
+
+    def getStats(self):
+        with self.lock:
+            return {
+                'read_calls' : self.readCalls,
+                'bytes_read' : self.bytesRead,
+            }
+
+
+# Default read planning parameters: ranges closer than READ_GAP bytes are
+# merged into one read, small reads fetch at least READ_AHEAD bytes
+#
+READ_GAP   = 64 * 1024
+READ_AHEAD = 64 * 1024
+
+# Read-ahead of a voxel's first read, enough for the channel count and
+# the headers of a typical voxel
+VOXEL_HEADER_READ_AHEAD = 4 + 32 * 16
+
+
+# Plans reads of one voxel: small header reads are served from a read-ahead
+# window, payload ranges are sorted and merged into as few contiguous reads
+# as possible when they are at most maxGap bytes apart. Payloads of maxGap
+# bytes or more are read on their own, merged ones are returned as
+# memoryview slices of the block, so nothing is copied.
+#
+class ReadPlanner(object):
+    def __init__(self, meshFile, maxGap=READ_GAP, readAhead=READ_AHEAD):
+        self.meshFile  = meshFile
+        self.maxGap    = maxGap
+        self.readAhead = readAhead
+
+        self.window       = None
+        self.windowOffset = 0
+
+    def inWindow(self, size, offset):
+        return self.window is not None and \
+            self.windowOffset <= offset and offset + size <= self.windowOffset + len(self.window)
+
+    def read(self, size, offset, readAhead=None):
+        if readAhead is None:
+            readAhead = self.readAhead
+
+        if not self.inWindow(size, offset):
+            self.window       = self.meshFile.pread(max(size, readAhead), offset)
+            self.windowOffset = offset
+
+        start = offset - self.windowOffset
+        return self.window[start:start+size]
+
+    def readRanges(self, ranges):
+        results = [None] * len(ranges)
+
+        groups = []
+        for i in sorted(range(len(ranges)), key=lambda i: ranges[i][0]):
+            offset, size = ranges[i]
+
+            if self.inWindow(size, offset):
+                results[i] = self.read(size, offset)
+                continue
+
+            if groups and size < self.maxGap and groups[-1][3] and offset - groups[-1][1] <= self.maxGap:
+                groups[-1][1] = max(groups[-1][1], offset + size)
+                groups[-1][2].append(i)
+            else:
+                groups.append([offset, offset + size, [i], size < self.maxGap])
+
+        for groupStart, groupEnd, members, mergeable in groups:
+            block = self.meshFile.pread(groupEnd - groupStart, groupStart)
+
+            if len(members) == 1:
+                results[members[0]] = block
+                continue
+
+            block = memoryview(block)
+            for i in members:
+                offset, size = ranges[i]
+                results[i] = block[offset-groupStart:offset-groupStart+size]
+
+        return results
+
+    def release(self):
+        self.window = None
+
+
+# *.vrmesh file read with positional reads only. Readers never share a
+# file position, so one handle can serve concurrent frame loads.
+#
+class MeshFileHandle(object):
+    # pread() returns new bytes objects
+    mapped = False
+
+    def __init__(self, filepath):
+        self.name = filepath
+
+        self._file = open(filepath, "rb")
+        self._fd   = self._file.fileno()
+        self._lock = threading.Lock()
+
+        self.size = os.fstat(self._fd).st_size
+
+        self.ioStats = IOStats()
+
+    # The handle is owned by everything reading from it (voxels, channels),
+    # so it's closed once the last of them is gone
+    #
+    def __del__(self):
+        if getattr(self, '_file', None):
+            self.close()
+
+    def pread(self, size, offset):
+        # os.pread() on a closed descriptor could read a file that reused it
+        if self._file.closed:
+            raise ValueError("read of closed file")
+
+        if not hasattr(os, 'pread'):
+            # No os.pread() on Windows
+            with self._lock:
+                self._file.seek(offset)
+                data = self._file.read(size)
+        else:
+            data = os.pread(self._fd, size, offset)
+
+            # Large reads may be split by the OS
+            while len(data) < size:
+                chunk = os.pread(self._fd, size - len(data), offset + len(data))
+                if not chunk:
+                    break
+                data += chunk
+
+        self.ioStats.add(len(data))
+
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+# Read-only memory mapped *.vrmesh file.
+# Same interface as MeshFileHandle, but pread() returns memoryview slices
+# into the mapping instead of copying data into new bytes objects.
+#
+class MappedMeshFile(object):
+    mapped = True
+
+    def __init__(self, filepath):
+        self.name = filepath
+
+        self._file = open(filepath, "rb")
+        self._map  = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        self.size = len(self._view)
+
+        self.ioStats = IOStats()
+
+    def __del__(self):
+        if getattr(self, '_map', None):
+            self.close()
+
+    def pread(self, size, offset):
+        data = self._view[offset:offset+size]
+
+        self.ioStats.add(len(data))
+
+        return data
+
+    def close(self):
+        if self._map is None:
+            return
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # Channel data still references the mapping,
+            # it will be unmapped when the last view is released
+            pass
+        self._file.close()
+        self._map = None
+
+
+# Process-wide LRU cache of decoded channel data.
+# Data is stored once per content key (hash of the raw channel payload, see
+# VoxelChannel.getContentKey()) and shared by every location key
+# (resolved path, mtime, size, voxel offset, channelID) referencing it, so
+# repeated frames and copies of a file under other paths take no extra
+# memory. Least recently used content is evicted once maxSize bytes are
+# exceeded.
+#
+class DecodedCache(object):
+    def __init__(self, maxSize):
+        self.maxSize = maxSize
+        self.size    = 0
+
+        self.hits       = 0
+        self.misses     = 0
+        self.sharedHits = 0
+        self.evictions  = 0
+
+        self.entries = OrderedDict()
+        self.lock    = threading.Lock()
+
+        # location key -> content key, content key -> location keys
+        self.locations        = {}
+        self.contentLocations = {}
+
+    def get(self, key):
+        with self.lock:
+            contentKey = self.locations.get(key)
+            if contentKey is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(contentKey)
+            self.hits += 1
+
+            return self.entries[contentKey]
+
+    # Data already decoded from an identical payload at another location;
+    # on a hit key is linked to it
+    #
+    def getContent(self, contentKey, key):
+        with self.lock:
+            data = self.entries.get(contentKey)
+            if data is None:
+                return None
+
+            self.entries.move_to_end(contentKey)
+            self._link(key, contentKey)
+            self.sharedHits += 1
+
+            return data
+
+    def put(self, key, data, contentKey=None):
+        if contentKey is None:
+            contentKey = key
+
+        dataSize = len(data)
+        if dataSize > self.maxSize:
+            return
+
+        with self.lock:
+            if contentKey not in self.entries:
+                self.entries[contentKey] = data
+                self.size += dataSize
+
+            self._link(key, contentKey)
+
+            self._evict()
+
+    def setMaxSize(self, maxSize):
+        with self.lock:
+            self.maxSize = maxSize
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.locations.clear()
+            self.contentLocations.clear()
+            self.size = 0
+
+    def getStats(self):
+        with self.lock:
+            return {
+                'hits'        : self.hits,
+                'misses'      : self.misses,
+                'shared_hits' : self.sharedHits,
+                'evictions'   : self.evictions,
+                'entries'     : len(self.entries),
+                'locations'   : len(self.locations),
+                'size'        : self.size,
+                'max_size'    : self.maxSize,
+            }
+
+    def _link(self, key, contentKey):
+        oldContentKey = self.locations.get(key)
+        if oldContentKey == contentKey:
+            return
+        if oldContentKey is not None:
+            self.contentLocations[oldContentKey].discard(key)
+
+        self.locations[key] = contentKey
+        self.contentLocations.setdefault(contentKey, set()).add(key)
+
+    def _evict(self):
+        while self.entries and self.size > self.maxSize:
+            contentKey, data = self.entries.popitem(last=False)
+            self.size -= len(data)
+            self.evictions += 1
+
+            for key in self.contentLocations.pop(contentKey, ()):
+                del self.locations[key]
+
+
+DECODED_CACHE_SIZE = 256 * 1024 * 1024
+
+decodedCache = DecodedCache(DECODED_CACHE_SIZE)
+
 
 
 class MeshFileReader(object):
-    meshFile = None
+    __slots__ = ('meshFile',)
 
     def report(self, *args):
         if USE_DEBUG:
             print(*args)
 
-    def binRead(self, format, length):
-        rawData = self.meshFile.read(length)
+    def binRead(self, format, offset):
+        rawData = self.meshFile.pread(struct.calcsize(format), offset)
         data    = struct.unpack(format, rawData)
         return data
 
 
 
-class VoxelChannel(MeshFileReader):
-    elementSize  = None
-    numElements  = None
-    channelID    = None
-    depChannelID = None
-    flags        = None
+# elementSize, numElements, channelID, depChannelID, flags
+ChannelHeader = struct.Struct("=IIHHI")
+
+CHANNEL_HEADER_SIZE = ChannelHeader.size
 
-    data         = None
+
+class VoxelChannel(MeshFileReader):
+    __slots__ = (
+        'elementSize',
+        'numElements',
+        'channelID',
+        'depChannelID',
+        'flags',
+        'dataOffset',
+        'dataSize',
+        'checksumOffset',
+        'cacheKey',
+        'contentKey',
+        'data',
+    )
 
     def __init__(self, meshFile):
         self.meshFile = meshFile
 
-    def loadInfo(self):
-        self.elementSize  = self.binRead("I", 4)[0]
-        self.numElements  = self.binRead("I", 4)[0]
-        self.channelID    = self.binRead("H", 2)[0]
-        self.depChannelID = self.binRead("H", 2)[0]
-        self.flags        = self.binRead("I", 4)[0]
+        self.elementSize  = None
+        self.numElements  = None
+        self.channelID    = None
+        self.depChannelID = None
+        self.flags        = None
+
+        # Location of the (possibly compressed) channel payload,
+        # filled by VoxelChannels.loadInfo()
+        self.dataOffset   = None
+        self.dataSize     = None
+
+        # Location of the per element checksums following the payload,
+        # None unless the file is read with checksum verification
+        self.checksumOffset = None
+
+        # Keys into decodedCache, None if the channel is not cached
+        self.cacheKey     = None
+        self.contentKey   = None
+
+        self.data         = None
+
+    def loadInfo(self, offset):
+        self.decodeInfo(self.meshFile.pread(CHANNEL_HEADER_SIZE, offset))
+
+    def decodeInfo(self, headerData):
+        self.elementSize, self.numElements, self.channelID, self.depChannelID, self.flags = ChannelHeader.unpack(headerData)
 
     def printInfo(self):
         self.report("Channel")
         self.report("  elementSize  = %i" % (self.elementSize))
         self.report("  numElements  = %i" % (self.numElements))
-        self.report("  channelID    = %s" % (ChannelID[self.channelID] if self.channelID in ChannelID else str(self.channelID)))
+        self.report("  channelID    = %s" % (getChannelName(self.channelID)))
         self.report("  depChannelID = %i" % (self.depChannelID))
 
         flagsList = []
@@ -144,59 +622,222 @@ class VoxelChannel(MeshFileReader):
                 flagsList.append(ChannelFlags[key])
         self.report("  flags        = %s" % (", ".join(flagsList)))
 
-    def loadData(self):
-        def _readChannelData(size):
-            channelRawData = self.meshFile.read(size)
-            if self.flags & MF_COMPRESSED:
+    def getElementsSize(self):
+        return self.elementSize * self.numElements
+
+    # Upper bound of the bytes the channel takes in the file, from zlib's
+    # worst case expansion for compressed payloads
+    #
+    def getMaxDataSize(self, hasChecksums=False):
+        dataSize = self.getElementsSize()
+        if self.flags & MF_COMPRESSED:
+            dataSize = 4 + dataSize + (dataSize >> 12) + (dataSize >> 14) + (dataSize >> 25) + 13
+        if hasChecksums:
+            dataSize += 4 * self.numElements
+        return dataSize
+
+    def readRawData(self):
+        return self.meshFile.pread(self.dataSize, self.dataOffset)
+
+    def decodeData(self, channelRawData):
+        if self.flags & MF_COMPRESSED:
+            # Inflating into a buffer of the known size avoids growing
+            # (and copying) the output; truncated streams are decoded as
+            # far as possible, as before
+            try:
+                data = zlib.decompress(channelRawData, bufsize=self.getElementsSize())
+            except zlib.error:
                 data = zlib.decompressobj().decompress(channelRawData)
-                # self.report("  Compressed data:", channelRawData)
-                # self.report("  Uncompressed data:", self.data)
-                self.report("  Expected / uncompressed size:", elementsSize, len(data))
-            else:
-                data = channelRawData
-            return data
+            # self.report("  Compressed data:", channelRawData)
+            # self.report("  Uncompressed data:", self.data)
+            self.report("  Expected / uncompressed size:", self.getElementsSize(), len(data))
+        else:
+            data = channelRawData
+        return data
 
+    def loadData(self):
+        if self.loadCachedData():
+            return
+
+        self.readData()
+
+    def readData(self):
         self.report("Channel Data")
+        self.report("  Data offset = %i" % (self.dataOffset))
+        self.report("  Data size = %i" % (self.dataSize))
 
-        elementsSize = self.elementSize * self.numElements
+        channelRawData = self.readRawData()
 
-        dataSize = elementsSize
-        if self.flags & MF_COMPRESSED:
-            self.report("  Data is compressed")
-            dataSize = self.binRead("I", 4)[0]
+        if not self.loadContentData(channelRawData):
+            self.data = self.decodeData(channelRawData)
 
-        self.report("  Data size = %i" % (dataSize))
+        if self.checksumOffset is not None:
+            self.verifyChecksums(self.data)
 
-        if self.channelID in {VERT_GEOM_CHANNEL, FACE_TOPO_CHANNEL, MAYA_INFO_CHANNEL}:
-            self.data = _readChannelData(dataSize)
-        else:
-            self.meshFile.seek(dataSize, os.SEEK_CUR)
+        self.storeCachedData()
+
+    def loadCachedData(self):
+        # Cached data may have been decoded without checking it, channels
+        # with checksums to verify are always read from the file
+        if self.cacheKey is None or self.checksumOffset is not None:
+            return False
+
+        self.data = decodedCache.get(self.cacheKey)
+
+        return self.data is not None
+
+    # Identical raw payloads decode to identical data, whatever file or
+    # voxel they come from
+    #
+    def getContentKey(self, channelRawData):
+        return (self.flags & MF_COMPRESSED, self.elementSize, self.numElements, hashlib.sha1(channelRawData).digest())
+
+    # Looks up data decoded from an identical payload elsewhere,
+    # so it's shared instead of decoded again
+    #
+    def loadContentData(self, channelRawData):
+        # Uncompressed memory mapped data is already served without copies
+        if self.cacheKey is None or self.meshFile.mapped and not self.flags & MF_COMPRESSED:
+            return False
+
+        self.contentKey = self.getContentKey(channelRawData)
+        self.data = decodedCache.getContent(self.contentKey, self.cacheKey)
+
+        return self.data is not None
+
+    def storeCachedData(self):
+        # Uncompressed memory mapped data is already served without copies
+        if self.cacheKey is None or isinstance(self.data, memoryview):
+            return
+
+        decodedCache.put(self.cacheKey, self.data, self.contentKey)
+
+    def getData(self):
+        if self.data is None:
+            self.loadData()
+        return self.data
 
     def loadChechsum(self):
         self.report("Channel Checksums")
 
-        for i in range(self.numElements):
-            channelCRC  = self.binRead("I", 4)[0]
+        checksums = array.array('I')
+        checksums.frombytes(self.meshFile.pread(4 * self.numElements, self.checksumOffset))
+
+        if USE_DEBUG:
+            for i,channelCRC in enumerate(checksums):
+                self.report("  %i: checksum = %i" % (i, channelCRC))
+
+        return checksums
+
+    # Reads, decodes and checks the channel, see verifyChecksums()
+    #
+    def verifyData(self):
+        return self.verifyChecksums(self.decodeData(self.readRawData()))
+
+    # Compares CRC32 of the decoded elements against the stored checksums.
+    # The check is serial: elements are only a few bytes and zlib.crc32()
+    # keeps the GIL for buffers that small, so threads wouldn't help.
+    # Returns the number of checked bytes, raises ChecksumError on mismatch.
+    #
+    def verifyChecksums(self, data):
+        checksums = self.loadChechsum()
 
-            self.report("  %i: checksum = %i" % (i, channelCRC))
+        if len(data) != self.getElementsSize():
+            raise ChecksumError("%s: expected %i bytes, got %i" % (getChannelName(self.channelID), self.getElementsSize(), len(data)))
+
+        computed = _computeChecksums(data, self.elementSize, self.numElements)
+
+        if computed != checksums:
+            badElements = sum(1 for a, b in zip(computed, checksums) if a != b)
+            raise ChecksumError("%s at offset %i: %i corrupted elements" % (getChannelName(self.channelID), self.dataOffset, badElements))
+
+        return len(data)
 
 
 
 class VoxelChannels(MeshFileReader):
-    channels = None
+    channels   = None
+    channelMap = None
+    executor   = None
+    fileKey    = None
 
-    def __init__(self, meshFile):
-        self.meshFile = meshFile
-        self.channels = []
-    
-    def loadInfo(self, voxelOffset=None):
-        self.channelCount = self.binRead("I", 4)[0]
+    # hasChecksums: payloads are followed by per element checksums,
+    # verifyChecksums: decoded data is checked against them
+    hasChecksums    = False
+    verifyChecksums = False
+
+    # End of the voxel's data, set by loadInfo()
+    dataEnd = None
+
+    reader = None
+
+    def __init__(self, meshFile, executor=None, fileKey=None, hasChecksums=False, readGap=READ_GAP, readAhead=READ_AHEAD, verifyChecksums=False):
+        self.meshFile   = meshFile
+        self.channels   = []
+        self.channelMap = {}
+        self.executor   = executor
+        self.fileKey    = fileKey
+
+        self.hasChecksums    = hasChecksums
+        self.verifyChecksums = verifyChecksums
+
+        self.reader = ReadPlanner(meshFile, readGap, readAhead)
+
+    def loadInfo(self, voxelOffset):
+        self.channelCount = struct.unpack("I", self.reader.read(4, voxelOffset, VOXEL_HEADER_READ_AHEAD))[0]
+
+        headerOffset = voxelOffset + 4
+        headerData   = self.reader.read(self.channelCount * CHANNEL_HEADER_SIZE, headerOffset)
 
         for i in range(self.channelCount):
             voxelChannel = VoxelChannel(self.meshFile)
-            voxelChannel.loadInfo()
+            voxelChannel.decodeInfo(headerData[i*CHANNEL_HEADER_SIZE:(i+1)*CHANNEL_HEADER_SIZE])
+
+            headerOffset += CHANNEL_HEADER_SIZE
+
+            if self.fileKey is not None:
+                voxelChannel.cacheKey = self.fileKey + (voxelOffset, voxelChannel.channelID)
 
             self.channels.append(voxelChannel)
+            self.channelMap.setdefault(voxelChannel.channelID, voxelChannel)
+
+        # Record payload locations. Channel data follows the headers in the
+        # same order; compressed payloads are prefixed with their size, so
+        # only those prefixes have to be read here.
+        dataOffset = headerOffset
+
+        # Upper bound of the bytes from each channel's data to the end of the
+        # last size prefix. A prefix read fetches that much ahead if it fits
+        # in the read-ahead window, so all remaining prefixes come with one
+        # read, and only the prefix itself otherwise; large payloads in
+        # between would just waste the window.
+        prefixSpans = []
+        prefixSpan  = None
+        for channel in reversed(self.channels):
+            if prefixSpan is not None:
+                prefixSpan += channel.getMaxDataSize(self.hasChecksums)
+            elif channel.flags & MF_COMPRESSED:
+                prefixSpan = 4
+            prefixSpans.append(prefixSpan)
+        prefixSpans.reverse()
+
+        for channel, prefixSpan in zip(self.channels, prefixSpans):
+            if channel.flags & MF_COMPRESSED:
+                readAhead = prefixSpan if prefixSpan <= self.reader.readAhead else 4
+                channel.dataSize = struct.unpack("I", self.reader.read(4, dataOffset, readAhead))[0]
+                dataOffset += 4
+            else:
+                channel.dataSize = channel.getElementsSize()
+
+            channel.dataOffset = dataOffset
+            dataOffset += channel.dataSize
+
+            if self.hasChecksums:
+                if self.verifyChecksums:
+                    channel.checksumOffset = dataOffset
+                dataOffset += 4 * channel.numElements
+
+        self.dataEnd = dataOffset
 
     def printInfo(self):
         self.report("Voxel")
@@ -205,15 +846,59 @@ class VoxelChannels(MeshFileReader):
         for channel in self.channels:
             channel.printInfo()
 
-    def loadData(self):
-        for channel in self.channels:
-            channel.loadData()
+    def loadData(self, channelIDs=None):
+        channels = [channel for channel in self.channels
+                    if channel.data is None and (channelIDs is None or channel.channelID in channelIDs)
+                    and not channel.loadCachedData()]
+
+        if not channels:
+            return
+
+        # Payloads are fetched with as few reads as possible
+        channelsRawData = self.reader.readRanges([(channel.dataOffset, channel.dataSize) for channel in channels])
+
+        # Channels already decoded from identical payloads are shared
+        decodeChannels = []
+        for channel, channelRawData in zip(channels, channelsRawData):
+            if not channel.loadContentData(channelRawData):
+                decodeChannels.append((channel, channelRawData))
+
+        compressedCount = sum(1 for channel, channelRawData in decodeChannels if channel.flags & MF_COMPRESSED)
+
+        # Uncompressed payloads sliced out of a merged read are copied, so
+        # they don't keep the whole block alive
+        if not self.meshFile.mapped:
+            decodeChannels = [(channel, bytes(channelRawData) if not channel.flags & MF_COMPRESSED else channelRawData)
+                              for channel, channelRawData in decodeChannels]
+
+        if self.executor is None or compressedCount < 2:
+            for channel, channelRawData in decodeChannels:
+                channel.data = channel.decodeData(channelRawData)
+        else:
+            # Inflate on the pool; zlib releases the GIL during decompression
+            pending = []
+            for channel, channelRawData in decodeChannels:
+                if channel.flags & MF_COMPRESSED:
+                    pending.append((channel, self.executor.submit(channel.decodeData, channelRawData)))
+                else:
+                    channel.data = channelRawData
+
+            for channel, future in pending:
+                channel.data = future.result()
+
+        for channel in channels:
+            if channel.checksumOffset is not None:
+                channel.verifyChecksums(channel.data)
+            channel.storeCachedData()
 
     def getChannelByType(self, channelType=VERT_GEOM_CHANNEL):
-        for channel in self.channels:
-            if channel.channelID == channelType:
-                return channel
-        return None
+        return self.channelMap.get(channelType)
+
+    def getChannelData(self, channelType):
+        channel = self.getChannelByType(channelType)
+        if channel is None:
+            return None
+        return channel.getData()
 
     def getFaceTopoChannel(self):
         return self.getChannelByType(FACE_TOPO_CHANNEL)
@@ -224,15 +909,21 @@ class VoxelChannels(MeshFileReader):
 
 
 class MeshVoxel(MeshFileReader):
-    fileOffset = None
-    bbox       = None
-    flags      = None
+    __slots__ = (
+        'fileOffset',
+        'bbox',
+        'flags',
+        'channels',
+    )
+
+    def __init__(self, meshFile, executor=None, fileKey=None, hasChecksums=False, readGap=READ_GAP, readAhead=READ_AHEAD, verifyChecksums=False):
+        self.meshFile = meshFile
 
-    channels = None
+        self.fileOffset = None
+        self.bbox       = None
+        self.flags      = None
 
-    def __init__(self, meshFile):
-        self.meshFile = meshFile
-        self.channels = VoxelChannels(self.meshFile)
+        self.channels = VoxelChannels(self.meshFile, executor, fileKey, hasChecksums, readGap, readAhead, verifyChecksums)
 
     def printInfo(self):
         self.report("Voxel")
@@ -240,156 +931,527 @@ class MeshVoxel(MeshFileReader):
         self.report("  bbox       = %s" % ("%.2f,%.2f,%.2f; %.2f,%.2f,%.2f" % (self.bbox)))
         self.report("  flags      = %s" % (VoxelFlags[self.flags]))
 
-    def loadData(self):
-        self.meshFile.seek(self.fileOffset)
-
-        self.channels.loadInfo()
+    def loadData(self, channelIDs=()):
+        self.channels.loadInfo(self.fileOffset)
         self.channels.printInfo()
-        self.channels.loadData()
+
+        # Channel data is decoded on first access,
+        # only channelIDs are decoded upfront
+        self.channels.loadData(channelIDs)
+
+        self.channels.reader.release()
 
     def chunk(self, input, size):
         return tuple(zip(*([iter(input)]*size)))
 
-    def getFaces(self):
-        faceTopoChannel = self.channels.getFaceTopoChannel()
-        
-        if faceTopoChannel is None:
-            return ()
-        
-        intArray   = struct.unpack("%ii"%(len(faceTopoChannel.data) / 4), faceTopoChannel.data)
-        facesArray = self.chunk(intArray, 3)
-        
-        return facesArray
+    def getChannelElements(self, channel, typeCode, output=OUTPUT_TUPLE, size=3):
+        if output not in OutputTypes:
+            raise ValueError("Unknown output type: %s" % output)
 
-    def getVertices(self):
-        vertexChannel = self.channels.getVertGeomChannel()
-        
-        if vertexChannel is None:
-            return ()
+        data = channel.getData() if channel is not None else b''
 
-        floatArray  = struct.unpack("%if"%(len(vertexChannel.data) / 4), vertexChannel.data)
-        vertexArray = self.chunk(floatArray, 3)
-        
-        return vertexArray
+        if output == OUTPUT_ARRAY:
+            _requireNumpy("OUTPUT_ARRAY")
+            return numpy.frombuffer(data, dtype=numpy.dtype(typeCode)).reshape(-1, size)
 
-    def getUvChannels(self):
-        uvChannles = []
-        for chan in self.channels.channels:
-            if chan.channelID >= VERT_TEX_CHANNEL0:
-                uvChannles.append(VERT_TEX_CHANNEL0 - chan.channelID)
-        return uvChannles
+        if output == OUTPUT_BUFFER:
+            return memoryview(data).cast('B').cast(typeCode)
 
-    def getUvChannelNames(self):
-        mayaInfoChannel = self.channels.getChannelByType(MAYA_INFO_CHANNEL)
-        if mayaInfoChannel is None:
+        if channel is None:
             return ()
 
-        uvChannels = []
+        flatArray = struct.unpack("%i%s" % (len(data) / 4, typeCode), data)
 
-        def _getBytes(data, size):
-            value = data[0:size]
-            data = data[size:]
-            return value, data
+        return self.chunk(flatArray, size)
 
-        number_of_uv_sets, mayaInfoChannel.data = _getBytes(mayaInfoChannel.data, 4)
-        number_of_uv_sets = struct.unpack("I", number_of_uv_sets)[0]
+    def getNumFaces(self):
+        faceTopoChannel = self.channels.getFaceTopoChannel()
 
-        for i in range(number_of_uv_sets):
-            name_len, mayaInfoChannel.data = _getBytes(mayaInfoChannel.data, 4)
-            name_len = struct.unpack("I", name_len)[0]
+        return faceTopoChannel.numElements if faceTopoChannel is not None else 0
 
-            name, mayaInfoChannel.data = _getBytes(mayaInfoChannel.data, name_len)
-            name = name.decode(encoding='ascii')
+    def getNumVertices(self):
+        vertexChannel = self.channels.getVertGeomChannel()
 
-            uvChannels.append(name)
+        return vertexChannel.numElements if vertexChannel is not None else 0
 
-        return uvChannels
+    def getFaces(self, output=OUTPUT_TUPLE):
+        faceTopoChannel = self.channels.getFaceTopoChannel()
 
+        return self.getChannelElements(faceTopoChannel, 'i', output)
 
-class VoxelInfo:
-    fileOffset = None
-    bbox       = None
-    flags      = None
+    def getVertices(self, output=OUTPUT_TUPLE):
+        vertexChannel = self.channels.getVertGeomChannel()
 
+        return self.getChannelElements(vertexChannel, 'f', output)
 
-class FrameInfo:
-    numVoxels = None
-    voxels    = None
+    def getNormals(self, output=OUTPUT_TUPLE):
+        normalChannel = self.channels.getChannelByType(VERT_NORMAL_CHANNEL)
 
-    def __init__(self):
-        self.voxels = []
+        return self.getChannelElements(normalChannel, 'f', output)
 
+    def getNormalFaces(self, output=OUTPUT_TUPLE):
+        normalTopoChannel = self.channels.getChannelByType(VERT_NORMAL_TOPO_CHANNEL)
 
-class MeshFile(MeshFileReader):
-    vrayID       = None
-    fileVersion  = None
-    lookupOffset = None
+        return self.getChannelElements(normalTopoChannel, 'i', output)
 
-    frames = None
+    # Normals expanded to face corners, (numFaces*3, 3) float32 array
+    #
+    def getFaceCornerNormals(self):
+        normals     = self.getNormals(OUTPUT_ARRAY)
+        normalFaces = self.getNormalFaces(OUTPUT_ARRAY)
 
-    def __init__(self, filepath):
-        self.meshFile = open(os.path.expanduser(filepath), "rb")
-        self.frames = {}
+        return normals[normalFaces.ravel()]
 
-    def __del__(self):
-        if self.meshFile:
-            self.meshFile.close()
+    def getVelocities(self, output=OUTPUT_TUPLE):
+        velocityChannel = self.channels.getChannelByType(VERT_VELOCITY_CHANNEL)
 
-    def readHeader(self):
-        self.vrayID = self.binRead("7s", 7)[0][:-1]
+        return self.getChannelElements(velocityChannel, 'f', output)
 
-        if self.vrayID == b'vrmesh':
-            # New format
-            self.fileVersion = self.binRead("I", 4)[0]
-        else:
-            # Old format
-            self.meshFile.seek(0)
-            self.vrayID = self.binRead("4s", 4)[0][:-1]
-            self.fileVersion = 0
+    # Vertex positions at the given time offsets (in the velocity channel's
+    # time units), evaluated as position + velocity * dt for all offsets at
+    # once. Returns a (len(times), N, 3) float32 array.
+    #
+    def getVerticesAtTimes(self, times):
+        vertices   = self.getVertices(OUTPUT_ARRAY)
+        velocities = self.getVelocities(OUTPUT_ARRAY)
 
-        self.lookupOffset = self.binRead("Q", 8)[0]
+        times = numpy.asarray(times, dtype=numpy.float32).reshape(-1, 1, 1)
 
-        self.report("MeshFile:", self.meshFile.name)
-        self.report("  fileID       = %s" % self.vrayID)
-        self.report("  fileVersion  = 0x%X" % self.fileVersion)
-        self.report("  lookupOffset = %i" % self.lookupOffset)
+        if velocities.shape != vertices.shape:
+            return numpy.broadcast_to(vertices, (times.shape[0],) + vertices.shape).copy()
 
+        return vertices + velocities * times
 
-    def readLookUpTable(self):
-        def readVoxelInfo():
-            vi = VoxelInfo()
+    # Per face material IDs: the first int of each FACE_INFO_CHANNEL element
+    #
+    def getFaceMaterialIDs(self, output=OUTPUT_TUPLE):
+        if output not in OutputTypes:
+            raise ValueError("Unknown output type: %s" % output)
 
-            vi.fileOffset = self.binRead("Q", 8)[0]
-            vi.bbox       = self.binRead("6f", 24)
-            vi.flags      = self.binRead("I", 4)[0]
+        faceInfoChannel = self.channels.getChannelByType(FACE_INFO_CHANNEL)
 
-            return vi
+        if faceInfoChannel is None or faceInfoChannel.numElements == 0:
+            data   = b''
+            stride = 4
+        else:
+            data   = faceInfoChannel.getData()
+            stride = faceInfoChannel.elementSize
 
-        def readFrameInfo():
-            numVoxels  = self.binRead("I", 4)[0]
-            if numVoxels == 0:
-                return None
+        if output == OUTPUT_ARRAY:
+            _requireNumpy("OUTPUT_ARRAY")
+            return numpy.ndarray((len(data) // stride,), dtype=numpy.int32, buffer=data, strides=(stride,))
 
-            frameInfo = FrameInfo()
-            frameInfo.numVoxels = numVoxels
+        if stride == 4:
+            flatArray = memoryview(data).cast('B').cast('i')
+            return flatArray if output == OUTPUT_BUFFER else tuple(flatArray)
 
-            for v in range(numVoxels):
-                frameInfo.voxels.append(readVoxelInfo())
+        faceInfoStruct = struct.Struct("i%ix" % (stride - 4))
+        mtlIDs = (faceInfo[0] for faceInfo in faceInfoStruct.iter_unpack(data))
 
-            return frameInfo
+        if output == OUTPUT_BUFFER:
+            return memoryview(array.array('i', mtlIDs))
 
-        self.meshFile.seek(self.lookupOffset)
+        return tuple(mtlIDs)
 
-        frameCount = 0
-        while True:
-            fi = readFrameInfo()
-            if not fi:
-                break
-            self.frames[frameCount] = fi
-            frameCount += 1
+    # Face indices grouped by material ID, ordered by ID. Faces keep their
+    # original order inside a group (stable sort).
+    #
+    def getMaterialFaceGroups(self):
+        mtlIDs = self.getFaceMaterialIDs(OUTPUT_ARRAY)
 
-        for frameNumber in self.frames:
-            fi = self.frames[frameNumber]
+        faceOrder = numpy.argsort(mtlIDs, kind='stable')
+        groupIDs, groupStarts = numpy.unique(mtlIDs[faceOrder], return_index=True)
+
+        return OrderedDict(zip(groupIDs.tolist(), numpy.split(faceOrder, groupStarts[1:])))
+
+    # Point cloud levels stored in this voxel as (level, numPoints) pairs,
+    # taken from the channel headers only
+    #
+    def getPointCloudLevels(self):
+        levels = []
+        for chan in self.channels.channels:
+            if POINTCLOUD_GEOM_CHANNEL <= chan.channelID < VERT_TEX_CHANNEL0:
+                levels.append((chan.channelID - POINTCLOUD_GEOM_CHANNEL, chan.numElements))
+        return sorted(levels)
+
+    # Decodes one point cloud level. Each element starts with the point
+    # position, followed by its normal when the element is wide enough.
+    #
+    def getPointCloud(self, level):
+        _requireNumpy("getPointCloud")
+
+        pointCloudChannel = self.channels.getChannelByType(POINTCLOUD_GEOM_CHANNEL + level)
+        if pointCloudChannel is None:
+            return None
+
+        data      = pointCloudChannel.getData()
+        stride    = pointCloudChannel.elementSize
+        numPoints = len(data) // stride if stride else 0
+
+        def _getVectors(offset):
+            return numpy.ndarray((numPoints, 3), dtype=numpy.float32, buffer=data, offset=offset, strides=(stride, 4))
+
+        return {
+            'level'     : level,
+            'positions' : _getVectors(0),
+            'normals'   : _getVectors(12) if stride >= 24 else None,
+        }
+
+    def getUvChannels(self):
+        uvChannles = []
+        for chan in self.channels.channels:
+            if VERT_TEX_CHANNEL0 <= chan.channelID < VERT_TEX_TOPO_CHANNEL0:
+                uvChannles.append(chan.channelID - VERT_TEX_CHANNEL0)
+        return sorted(uvChannles)
+
+    def getUvCoords(self, uvChannel, output=OUTPUT_TUPLE):
+        uvChannel = self.channels.getChannelByType(VERT_TEX_CHANNEL0 + uvChannel)
+
+        return self.getChannelElements(uvChannel, 'f', output)
+
+    def getUvFaces(self, uvChannel, output=OUTPUT_TUPLE):
+        uvTopoChannel = self.channels.getChannelByType(VERT_TEX_TOPO_CHANNEL0 + uvChannel)
+
+        return self.getChannelElements(uvTopoChannel, 'i', output)
+
+    # UV coordinates expanded to face corners, (numFaces*3, 3) float32 array
+    #
+    def getFaceCornerUvs(self, uvChannel):
+        uvCoords = self.getUvCoords(uvChannel, OUTPUT_ARRAY)
+        uvFaces  = self.getUvFaces(uvChannel, OUTPUT_ARRAY)
+
+        return uvCoords[uvFaces.ravel()]
+
+    # Decoded UV sets keyed by name. Names are taken from uvNames (or this
+    # voxel's MAYA_INFO_CHANNEL) in UV channel order.
+    #
+    def getUvSets(self, uvNames=None):
+        if uvNames is None:
+            uvNames = self.getUvChannelNames()
+
+        uvSets = OrderedDict()
+        for i,uvChannel in enumerate(self.getUvChannels()):
+            uvName = uvNames[i] if i < len(uvNames) else "UVSet%i" % uvChannel
+
+            uvSets[uvName] = {
+                'coords'  : self.getUvCoords(uvChannel, OUTPUT_ARRAY),
+                'faces'   : self.getUvFaces(uvChannel, OUTPUT_ARRAY),
+                'corners' : self.getFaceCornerUvs(uvChannel),
+            }
+        return uvSets
+
+    def getUvChannelNames(self):
+        mayaInfoChannel = self.channels.getChannelByType(MAYA_INFO_CHANNEL)
+        if mayaInfoChannel is None:
+            return ()
+
+        uvChannels = []
+
+        data = mayaInfoChannel.getData()
+
+        def _getBytes(data, size):
+            value = data[0:size]
+            data = data[size:]
+            return value, data
+
+        number_of_uv_sets, data = _getBytes(data, 4)
+        number_of_uv_sets = struct.unpack("I", number_of_uv_sets)[0]
+
+        for i in range(number_of_uv_sets):
+            name_len, data = _getBytes(data, 4)
+            name_len = struct.unpack("I", name_len)[0]
+
+            name, data = _getBytes(data, name_len)
+            name = bytes(name).decode(encoding='ascii')
+
+            uvChannels.append(name)
+
+        return uvChannels
+
+
+# Union of (N,6) bounding boxes, ignoring NaN boxes; None if there are none
+#
+def _getBBoxUnion(bboxes):
+    bboxes = bboxes[~numpy.isnan(bboxes).any(axis=1)]
+    if not len(bboxes):
+        return None
+
+    return numpy.concatenate((bboxes[:, :3].min(axis=0), bboxes[:, 3:].max(axis=0)))
+
+
+# Lookup table records
+#
+LookupVoxelCount = struct.Struct("=I")
+LookupVoxelInfo  = struct.Struct("=Q6fI")
+
+
+# Columnar lookup table: per frame voxel ranges and
+# per voxel file offsets, bounding boxes and flags
+#
+class LookupTable:
+    frameVoxelStart = None
+    frameNumVoxels  = None
+
+    voxelOffsets = None
+    voxelBBoxes  = None
+    voxelFlags   = None
+
+    def __init__(self):
+        self.frameVoxelStart = array.array('I')
+        self.frameNumVoxels  = array.array('I')
+
+        self.voxelOffsets = array.array('Q')
+        self.voxelBBoxes  = array.array('f')
+        self.voxelFlags   = array.array('I')
+
+    def decode(self, data):
+        dataSize = len(data)
+        pos      = 0
+
+        while pos + LookupVoxelCount.size <= dataSize:
+            numVoxels = LookupVoxelCount.unpack_from(data, pos)[0]
+            pos += LookupVoxelCount.size
+            if numVoxels == 0:
+                break
+
+            blockSize = numVoxels * LookupVoxelInfo.size
+            if pos + blockSize > dataSize:
+                break
+
+            self.frameVoxelStart.append(len(self.voxelOffsets))
+            self.frameNumVoxels.append(numVoxels)
+
+            for voxelInfo in LookupVoxelInfo.iter_unpack(data[pos:pos+blockSize]):
+                self.voxelOffsets.append(voxelInfo[0])
+                self.voxelBBoxes.extend(voxelInfo[1:7])
+                self.voxelFlags.append(voxelInfo[7])
+
+            pos += blockSize
+
+    def getVoxelBBoxes(self):
+        return numpy.frombuffer(self.voxelBBoxes, dtype=numpy.float32).reshape(-1, 6)
+
+    # Per frame union of voxel bounding boxes as a (numFrames, 6) array,
+    # optionally only over voxels with the given flags. Frames without
+    # matching voxels get NaN bounds.
+    #
+    def getFrameBBoxes(self, voxelFlags=None):
+        _requireNumpy("getFrameBBoxes")
+
+        numFrames = self.getNumFrames()
+        if numFrames == 0:
+            return numpy.empty((0, 6), dtype=numpy.float32)
+
+        voxelMin = self.getVoxelBBoxes()[:, :3]
+        voxelMax = self.getVoxelBBoxes()[:, 3:]
+
+        if voxelFlags is not None:
+            mask = (numpy.frombuffer(self.voxelFlags, dtype=numpy.uint32) == voxelFlags)[:, None]
+            voxelMin = numpy.where(mask, voxelMin, numpy.inf)
+            voxelMax = numpy.where(mask, voxelMax, -numpy.inf)
+
+        # Voxels of a frame are stored contiguously
+        frameStart = numpy.frombuffer(self.frameVoxelStart, dtype=numpy.uint32).astype(numpy.intp)
+
+        frameBBoxes = numpy.hstack((
+            numpy.minimum.reduceat(voxelMin, frameStart, axis=0),
+            numpy.maximum.reduceat(voxelMax, frameStart, axis=0),
+        )).astype(numpy.float32)
+
+        frameBBoxes[~numpy.isfinite(frameBBoxes).all(axis=1)] = numpy.nan
+
+        return frameBBoxes
+
+    def getNumFrames(self):
+        return len(self.frameNumVoxels)
+
+    def getNumVoxels(self):
+        return len(self.voxelOffsets)
+
+
+class VoxelInfo:
+    __slots__ = ('lookupTable', 'index')
+
+    def __init__(self, lookupTable, index):
+        self.lookupTable = lookupTable
+        self.index       = index
+
+    @property
+    def fileOffset(self):
+        return self.lookupTable.voxelOffsets[self.index]
+
+    @property
+    def bbox(self):
+        return tuple(self.lookupTable.voxelBBoxes[self.index*6:self.index*6+6])
+
+    @property
+    def flags(self):
+        return self.lookupTable.voxelFlags[self.index]
+
+
+class FrameInfo:
+    __slots__ = ('lookupTable', 'frameIndex')
+
+    def __init__(self, lookupTable, frameIndex):
+        self.lookupTable = lookupTable
+        self.frameIndex  = frameIndex
+
+    @property
+    def numVoxels(self):
+        return self.lookupTable.frameNumVoxels[self.frameIndex]
+
+    @property
+    def voxels(self):
+        voxelStart = self.lookupTable.frameVoxelStart[self.frameIndex]
+        return [VoxelInfo(self.lookupTable, i) for i in range(voxelStart, voxelStart + self.numVoxels)]
+
+
+# Read-only frameIndex -> FrameInfo mapping over a LookupTable.
+# FrameInfo views are created on access instead of being kept alive.
+#
+class LookupFrames(Mapping):
+    __slots__ = ('lookupTable',)
+
+    def __init__(self, lookupTable):
+        self.lookupTable = lookupTable
+
+    def __getitem__(self, frameIndex):
+        if frameIndex not in self:
+            raise KeyError(frameIndex)
+        return FrameInfo(self.lookupTable, operator.index(frameIndex))
+
+    def __contains__(self, frameIndex):
+        try:
+            frameIndex = operator.index(frameIndex)
+        except TypeError:
+            return False
+        return 0 <= frameIndex < self.lookupTable.getNumFrames()
+
+    def __iter__(self):
+        return iter(range(self.lookupTable.getNumFrames()))
+
+    def __len__(self):
+        return self.lookupTable.getNumFrames()
+
+
+class MeshFile(MeshFileReader):
+    filepath     = None
+    vrayID       = None
+    fileVersion  = None
+    lookupOffset = None
+    lookupTable  = None
+
+    lookupTableHash = None
+
+    frames = None
+
+    numThreads   = 0
+    executor     = None
+    executorLock = None
+
+    # File identity used in decodedCache keys
+    fileKey = None
+
+    # Whether channel payloads are followed by per element checksums,
+    # None until detected, see getHasChecksums()
+    hasChecksums = None
+
+    # Checksums are verified whenever channel data is decoded
+    verifyChecksums = False
+
+    # Read planning, see ReadPlanner
+    readGap   = READ_GAP
+    readAhead = READ_AHEAD
+
+    # Hashes of raw face topology payloads, see getTopologyHash()
+    topologyHashes = None
+
+    def __init__(self, filepath, useMmap=False, numThreads=0, useCache=True, verifyChecksums=False):
+        filepath = os.path.expanduser(filepath)
+
+        self.filepath = filepath
+
+        # With useMmap the file is memory mapped: header, lookup table and
+        # uncompressed channel data are served as memoryview slices into the
+        # mapping without intermediate copies
+        if useMmap:
+            self.meshFile = MappedMeshFile(filepath)
+        else:
+            self.meshFile = MeshFileHandle(filepath)
+        self.frames = {}
+
+        # With numThreads > 1 compressed channels of a voxel, and the
+        # voxels of multi voxel loads, are inflated in parallel on a
+        # thread pool
+        self.numThreads   = numThreads
+        self.executorLock = threading.Lock()
+
+        self.verifyChecksums = verifyChecksums
+
+        self.topologyHashes = {}
+
+        if useCache:
+            fileStat = os.stat(filepath)
+            self.fileKey = (os.path.realpath(filepath), fileStat.st_mtime_ns, fileStat.st_size)
+
+    # The file handle closes itself once no voxel references it
+    #
+    def __del__(self):
+        if self.executor:
+            self.executor.shutdown(wait=False)
+
+    def getExecutor(self):
+        if self.numThreads < 2:
+            return None
+        with self.executorLock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.numThreads)
+        return self.executor
+
+    def getIOStats(self):
+        return self.meshFile.ioStats.getStats()
+
+    def resetIOStats(self):
+        self.meshFile.ioStats.reset()
+
+    def readHeader(self):
+        self.vrayID = self.binRead("7s", 0)[0][:-1]
+
+        if self.vrayID == b'vrmesh':
+            # New format
+            self.fileVersion = self.binRead("I", 7)[0]
+            lookupOffsetPos  = 11
+        else:
+            # Old format
+            self.vrayID = self.binRead("4s", 0)[0][:-1]
+            self.fileVersion = 0
+            lookupOffsetPos  = 4
+
+        self.lookupOffset = self.binRead("Q", lookupOffsetPos)[0]
+
+        self.report("MeshFile:", self.meshFile.name)
+        self.report("  fileID       = %s" % self.vrayID)
+        self.report("  fileVersion  = 0x%X" % self.fileVersion)
+        self.report("  lookupOffset = %i" % self.lookupOffset)
+
+
+    def readLookUpTable(self):
+        # The lookup table is stored at the end of the file,
+        # read it at once and decode it in memory
+        lookupTableData = self.meshFile.pread(self.meshFile.size - self.lookupOffset, self.lookupOffset)
+
+        self.lookupTable = LookupTable()
+        self.lookupTable.decode(lookupTableData)
+
+        self.lookupTableHash = hashlib.sha1(lookupTableData).hexdigest()
+
+        self.frames = LookupFrames(self.lookupTable)
+
+        if not USE_DEBUG:
+            return
+
+        for frameNumber in self.frames:
+            fi = self.frames[frameNumber]
 
             self.report("Frame %i:" % frameNumber)
             self.report("  numVoxels = %s" % fi.numVoxels)
@@ -406,6 +1468,43 @@ class MeshFile(MeshFileReader):
         self.readLookUpTable()
 
 
+    # The format has no flag for per element checksums after the channel
+    # payloads, so their presence is detected from the layout: the voxel's
+    # channels have to end exactly at endOffset (the next voxel or the
+    # lookup table). Returns the channels read with the fitting layout and
+    # whether it has checksums, or (None, None) if neither layout fits.
+    #
+    def detectVoxelChecksums(self, fileOffset, endOffset, verifyChecksums=False):
+        for hasChecksums in (False, True):
+            channels = VoxelChannels(self.meshFile, hasChecksums=hasChecksums, readGap=self.readGap, readAhead=self.readAhead, verifyChecksums=verifyChecksums)
+            try:
+                channels.loadInfo(fileOffset)
+            except struct.error:
+                # Size prefixes read with the wrong layout point past the file end
+                continue
+            if channels.dataEnd == endOffset:
+                return channels, hasChecksums
+        return None, None
+
+
+    # Layout of the file, detected from its first voxel. Files where neither
+    # layout fits are read as files without checksums.
+    #
+    def getHasChecksums(self):
+        if self.hasChecksums is None:
+            voxelOffsets = self.lookupTable.voxelOffsets
+
+            hasChecksums = False
+            if voxelOffsets:
+                fileOffset = min(voxelOffsets)
+                endOffset  = min((offset for offset in voxelOffsets if offset > fileOffset), default=self.lookupOffset)
+                hasChecksums = bool(self.detectVoxelChecksums(fileOffset, endOffset)[1])
+
+            self.hasChecksums = hasChecksums
+
+        return self.hasChecksums
+
+
     def getFrameByType(self, animType, animOffset, speed, frame):
         def clamp(value, value_min, value_max):
             return max(min(value, value_max), value_min)
@@ -436,6 +1535,10 @@ class MeshFile(MeshFileReader):
         return int(frame)
 
 
+    def getFramesByType(self, animType, animOffset, speed, frames):
+        return getFramesByType(animType, animOffset, speed, frames, len(self.frames))
+
+
     def getPreviewVoxel(self, frameInfo):
         for voxel in frameInfo.voxels:
             if voxel.flags == MVF_PREVIEW_VOXEL:
@@ -450,8 +1553,223 @@ class MeshFile(MeshFileReader):
         return None
 
 
-    def getPreviewMesh(self, animType=0, animOffset=0.0, speed=1.0, frame=0.0):
+    # With useExecutor the voxel's channels are inflated on the thread pool;
+    # multi voxel loads pass False and run whole voxels as pool tasks
+    # instead, see mapVoxelTasks()
+    #
+    def loadVoxel(self, voxelInfo, channelIDs=(), useCache=True, useExecutor=True):
+        fileKey  = self.fileKey if useCache else None
+        executor = self.getExecutor() if useExecutor else None
+
+        voxel = MeshVoxel(self.meshFile, executor, fileKey, self.getHasChecksums(), self.readGap, self.readAhead, self.verifyChecksums)
+        voxel.fileOffset = voxelInfo.fileOffset
+        voxel.bbox       = voxelInfo.bbox
+        voxel.flags      = voxelInfo.flags
+
+        voxel.loadData(channelIDs)
+
+        return voxel
+
+
+    # Calls function(*args) for every tuple in argsList and returns the
+    # results in order. With a thread pool the calls run as parallel tasks,
+    # so they must not wait on the pool themselves: voxels loaded in them
+    # use loadVoxel(useExecutor=False) and decode their channels serially.
+    #
+    def mapVoxelTasks(self, function, argsList):
+        executor = self.getExecutor()
+        if executor is None or len(argsList) < 2:
+            return [function(*args) for args in argsList]
+        return [future.result() for future in [executor.submit(function, *args) for args in argsList]]
+
+
+    # Geometry voxels of a frame, optionally only those whose lookup table
+    # bbox intersects the (minX, minY, minZ, maxX, maxY, maxZ) query bbox
+    #
+    def getGeometryVoxels(self, frameInfo, bbox=None):
+        def _intersects(voxelBBox):
+            return all(voxelBBox[i] <= bbox[i+3] and bbox[i] <= voxelBBox[i+3] for i in range(3))
+
+        return [voxel for voxel in frameInfo.voxels
+                if voxel.flags == MVF_GEOMETRY_VOXEL and (bbox is None or _intersects(voxel.bbox))]
+
+
+    # Iterates over the geometry voxels of a file frame, yielding decoded
+    # vertex and face arrays one voxel at a time. Decoded data bypasses
+    # decodedCache and is only referenced by the yielded dict, so it is
+    # released as soon as the caller drops it. Vertices and faces are
+    # read and inflated one after the other.
+    #
+    # With maxMemory set, and the caller holding on to at most the last
+    # yielded dict (as a plain for loop does), the previous voxel's arrays
+    # plus the current voxel's arrays and its largest raw payload stay
+    # within maxMemory bytes, not counting zlib's fixed inflate state; a
+    # voxel that would exceed that raises MemoryError before any of its
+    # data is read. Without maxMemory and with a thread pool, up to
+    # numThreads voxels ahead are decoded in parallel.
+    #
+    def iterGeometryVoxels(self, frameIndex, maxMemory=None, bbox=None):
+        _requireNumpy("iterGeometryVoxels")
+
+        if frameIndex not in self.frames:
+            return
+
+        channelIDs = (VERT_GEOM_CHANNEL, FACE_TOPO_CHANNEL)
+
+        def _decodeMesh(voxelIndex, voxelInfo, voxel=None):
+            if voxel is None:
+                voxel = self.loadVoxel(voxelInfo, useCache=False, useExecutor=False)
+
+            for channelID in channelIDs:
+                voxel.channels.loadData((channelID,))
+
+            return {
+                'index'    : voxelIndex,
+                'bbox'     : voxelInfo.bbox,
+                'vertices' : voxel.getVertices(OUTPUT_ARRAY),
+                'faces'    : voxel.getFaces(OUTPUT_ARRAY),
+            }
+
+        voxelInfos = self.getGeometryVoxels(self.frames[frameIndex], bbox)
+
+        executor = self.getExecutor()
+
+        if maxMemory is None and executor is not None:
+            pending = deque()
+            for voxelIndex, voxelInfo in enumerate(voxelInfos):
+                pending.append(executor.submit(_decodeMesh, voxelIndex, voxelInfo))
+                if len(pending) > self.numThreads:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+            return
+
+        # Decoded size of the dict the caller may still hold
+        previousMemory = 0
+
+        for voxelIndex, voxelInfo in enumerate(voxelInfos):
+            voxel = self.loadVoxel(voxelInfo, useCache=False)
+
+            channels = [channel for channel in (voxel.channels.getChannelByType(channelID) for channelID in channelIDs) if channel is not None]
+
+            decodedMemory = sum(channel.getElementsSize() for channel in channels)
+
+            if maxMemory is not None:
+                voxelMemory = previousMemory + decodedMemory + max([channel.dataSize for channel in channels] or [0])
+                if voxelMemory > maxMemory:
+                    raise MemoryError("Voxel %i of frame %i needs %i bytes, over the %i bytes limit" % (voxelIndex, frameIndex, voxelMemory, maxMemory))
+
+            mesh = _decodeMesh(voxelIndex, voxelInfo, voxel)
+
+            # Drop channel buffers not handed out to the caller
+            voxel    = None
+            channels = None
+
+            previousMemory = decodedMemory
+
+            yield mesh
+
+            mesh = None
+
+
+    # All geometry voxels of a file frame merged into single vertex and face
+    # arrays. Outputs are preallocated from the channel headers, voxels are
+    # decoded into them (in parallel with a thread pool, see
+    # mapVoxelTasks()) and face indices are shifted by the voxels' vertex
+    # offsets in one pass. With bbox, voxels outside of it are skipped
+    # before anything is decompressed.
+    #
+    def getGeometryMesh(self, frameIndex, bbox=None):
+        _requireNumpy("getGeometryMesh")
+
+        if frameIndex not in self.frames:
+            return None
+
+        voxels = [self.loadVoxel(voxelInfo, useCache=False, useExecutor=False) for voxelInfo in self.getGeometryVoxels(self.frames[frameIndex], bbox)]
+
+        vertexCounts = numpy.array([voxel.getNumVertices() for voxel in voxels], dtype=numpy.int64)
+        faceCounts   = numpy.array([voxel.getNumFaces() for voxel in voxels], dtype=numpy.int64)
+
+        vertexOffsets = numpy.concatenate(([0], numpy.cumsum(vertexCounts)))
+        faceOffsets   = numpy.concatenate(([0], numpy.cumsum(faceCounts)))
+
+        vertices = numpy.empty((vertexOffsets[-1], 3), dtype=numpy.float32)
+        faces    = numpy.empty((faceOffsets[-1], 3), dtype=numpy.int32)
+
+        # Tasks write disjoint slices of the outputs
+        def _decodeVoxel(i):
+            # Release the decoded channels once the task is done
+            voxel     = voxels[i]
+            voxels[i] = None
+
+            voxel.channels.loadData((VERT_GEOM_CHANNEL, FACE_TOPO_CHANNEL))
+
+            vertices[vertexOffsets[i]:vertexOffsets[i+1]] = voxel.getVertices(OUTPUT_ARRAY)
+            faces[faceOffsets[i]:faceOffsets[i+1]]        = voxel.getFaces(OUTPUT_ARRAY)
+
+        self.mapVoxelTasks(_decodeVoxel, [(i,) for i in range(len(voxels))])
+
+        faces += numpy.repeat(vertexOffsets[:-1], faceCounts).astype(numpy.int32)[:, None]
+
+        return {
+            'vertices' : vertices,
+            'faces'    : faces,
+        }
+
+
+    # Topology key of a voxel: (file, flags, offset and size of the raw
+    # FACE_TOPO_CHANNEL payload). Only the channel headers are needed.
+    #
+    def getTopologyKey(self, voxel):
+        channel = voxel.channels.getFaceTopoChannel()
+        if channel is None:
+            return None
+        return self.makeTopologyKey(channel.flags, channel.dataOffset, channel.dataSize)
+
+
+    def makeTopologyKey(self, flags, dataOffset, dataSize):
+        return (self.fileKey or self.filepath, flags, dataOffset, dataSize)
+
+
+    def getTopologyHash(self, topologyKey):
+        topologyHash = self.topologyHashes.get(topologyKey)
+        if topologyHash is None:
+            fileKey, flags, dataOffset, dataSize = topologyKey
+            topologyHash = hashlib.sha1(self.meshFile.pread(dataSize, dataOffset)).digest()
+            self.topologyHashes[topologyKey] = topologyHash
+        return topologyHash
+
+
+    # Face channels with different flags or compressed sizes differ, otherwise
+    # the raw payloads are compared by hash without decompressing them
+    #
+    def isSameTopology(self, topologyKey, otherTopologyKey):
+        if topologyKey is None or otherTopologyKey is None:
+            return False
+        if topologyKey == otherTopologyKey:
+            return True
+        if topologyKey[0] != otherTopologyKey[0] or topologyKey[1] != otherTopologyKey[1] or topologyKey[3] != otherTopologyKey[3]:
+            return False
+        return self.getTopologyHash(topologyKey) == self.getTopologyHash(otherTopologyKey)
+
+
+    def getPreviewMesh(self, animType=0, animOffset=0.0, speed=1.0, frame=0.0, output=OUTPUT_TUPLE):
+        frameIndex = self.getFrameByType(animType, animOffset, speed, frame)
+
+        return self.getFramePreviewMesh(frameIndex, output)
+
+
+    # Positions only update of the preview mesh: pass the 'topology_key' of
+    # the previously returned mesh, if the topology didn't change only
+    # 'vertices' are decoded and 'faces' and 'uv_sets' are None
+    #
+    def getPreviewMeshUpdate(self, animType=0, animOffset=0.0, speed=1.0, frame=0.0, topologyKey=None, output=OUTPUT_TUPLE):
         frameIndex = self.getFrameByType(animType, animOffset, speed, frame)
+
+        return self.getFramePreviewMeshUpdate(frameIndex, topologyKey, output)
+
+
+    def getFramePreviewMeshUpdate(self, frameIndex, topologyKey=None, output=OUTPUT_TUPLE):
         if frameIndex not in self.frames:
             return None
 
@@ -459,15 +1777,43 @@ class MeshFile(MeshFileReader):
         if not voxelInfo:
             return None
 
-        voxel = MeshVoxel(self.meshFile)
-        voxel.fileOffset = voxelInfo.fileOffset
-        voxel.bbox       = voxelInfo.bbox
-        voxel.flags      = voxelInfo.flags
+        voxel = self.loadVoxel(voxelInfo)
+
+        frameTopologyKey = self.getTopologyKey(voxel)
 
-        voxel.loadData()
+        if not self.isSameTopology(topologyKey, frameTopologyKey):
+            return self.getVoxelPreviewMesh(voxel, frameIndex, output)
 
-        faces    = voxel.getFaces()
-        vertices = voxel.getVertices()
+        voxel.channels.loadData((VERT_GEOM_CHANNEL,))
+
+        return {
+            'vertices'     : voxel.getVertices(output),
+            'faces'        : None,
+            'uv_sets'      : None,
+            'topology_key' : frameTopologyKey,
+        }
+
+
+    def getFramePreviewMesh(self, frameIndex, output=OUTPUT_TUPLE):
+        if frameIndex not in self.frames:
+            return None
+
+        voxelInfo = self.getPreviewVoxel(self.frames[frameIndex])
+        if not voxelInfo:
+            return None
+
+        voxel = self.loadVoxel(voxelInfo)
+
+        return self.getVoxelPreviewMesh(voxel, frameIndex, output)
+
+
+    def getVoxelPreviewMesh(self, voxel, frameIndex, output=OUTPUT_TUPLE):
+        voxel.channels.loadData((VERT_GEOM_CHANNEL, FACE_TOPO_CHANNEL, MAYA_INFO_CHANNEL))
+
+        topologyKey = self.getTopologyKey(voxel)
+
+        faces    = voxel.getFaces(output)
+        vertices = voxel.getVertices(output)
 
         uvChannels = voxel.getUvChannelNames()
         if uvChannels:
@@ -477,12 +1823,7 @@ class MeshFile(MeshFileReader):
         else:
             geomVoxelInfo = self.getGeometryVoxel(self.frames[frameIndex])
             if geomVoxelInfo:
-                voxel = MeshVoxel(self.meshFile)
-                voxel.fileOffset = voxelInfo.fileOffset
-                voxel.bbox       = voxelInfo.bbox
-                voxel.flags      = voxelInfo.flags
-
-                voxel.loadData()
+                voxel = self.loadVoxel(geomVoxelInfo)
 
                 uvChannels = voxel.getUvChannels()
                 self.report("Number of UV channles: %i" % len(uvChannels))
@@ -490,23 +1831,556 @@ class MeshFile(MeshFileReader):
                     self.report("  UV Set %i: %i" % (i, chanId))
 
         return {
-            'vertices' : vertices,
-            'faces'    : faces,
-            'uv_sets'  : uvChannels,
+            'vertices'     : vertices,
+            'faces'        : faces,
+            'uv_sets'      : uvChannels,
+            'topology_key' : topologyKey,
+        }
+
+
+    # UV sets of a file frame, see MeshVoxel.getUvSets(). Names come from the
+    # preview voxel, data from the preview voxel if it has UV channels and
+    # from the geometry voxel otherwise.
+    #
+    def getFrameUvSets(self, frameIndex):
+        _requireNumpy("getFrameUvSets")
+
+        if frameIndex not in self.frames:
+            return None
+
+        frameInfo = self.frames[frameIndex]
+        uvNames   = ()
+
+        previewVoxelInfo = self.getPreviewVoxel(frameInfo)
+        if previewVoxelInfo:
+            voxel   = self.loadVoxel(previewVoxelInfo)
+            uvNames = voxel.getUvChannelNames()
+            if voxel.getUvChannels():
+                return voxel.getUvSets(uvNames)
+
+        geomVoxelInfo = self.getGeometryVoxel(frameInfo)
+        if geomVoxelInfo:
+            return self.loadVoxel(geomVoxelInfo).getUvSets(uvNames)
+
+        return OrderedDict()
+
+
+    # First voxel of a file frame that holds point cloud levels.
+    # Only channel headers are read to find it.
+    #
+    def getPointCloudVoxel(self, frameIndex):
+        if frameIndex not in self.frames:
+            return None
+
+        for voxelInfo in self.frames[frameIndex].voxels:
+            voxel = self.loadVoxel(voxelInfo)
+            if voxel.getPointCloudLevels():
+                return voxel
+
+        return None
+
+
+    def getPointCloudLevels(self, frameIndex=0):
+        voxel = self.getPointCloudVoxel(frameIndex)
+        if voxel is None:
+            return []
+        return voxel.getPointCloudLevels()
+
+
+    # Decodes a point cloud level of a file frame. Without an explicit level
+    # the densest level with at most pointBudget points is chosen (or the
+    # sparsest one, if none fits); without a budget the densest level.
+    #
+    def getPointCloud(self, frameIndex=0, level=None, pointBudget=None):
+        voxel = self.getPointCloudVoxel(frameIndex)
+        if voxel is None:
+            return None
+
+        levels = voxel.getPointCloudLevels()
+
+        if level is None:
+            levelsBySize = sorted(levels, key=lambda item: item[1])
+            level = levelsBySize[-1][0]
+
+            if pointBudget is not None:
+                fittingLevels = [item for item in levelsBySize if item[1] <= pointBudget]
+                level = fittingLevels[-1][0] if fittingLevels else levelsBySize[0][0]
+
+        return voxel.getPointCloud(level)
+
+
+    # Bounding box queries, answered from the lookup table only.
+    # Boxes are (minX, minY, minZ, maxX, maxY, maxZ); voxelFlags optionally
+    # restricts them to MVF_PREVIEW_VOXEL or MVF_GEOMETRY_VOXEL voxels.
+    #
+    def getFrameBBoxes(self, voxelFlags=None):
+        return self.lookupTable.getFrameBBoxes(voxelFlags)
+
+
+    def getBBoxUnion(self, frameStart=0, frameEnd=None, voxelFlags=None):
+        if frameEnd is None:
+            frameEnd = len(self.frames) - 1
+
+        frameBBoxes = self.getFrameBBoxes(voxelFlags)[max(frameStart, 0):frameEnd+1]
+
+        return _getBBoxUnion(frameBBoxes)
+
+
+    # Per scene frame bounding boxes after getFramesByType remapping
+    #
+    def getSceneFrameBBoxes(self, animType, animOffset, speed, frames, voxelFlags=None):
+        frameBBoxes = self.getFrameBBoxes(voxelFlags)
+        fileFrames  = self.getFramesByType(animType, animOffset, speed, frames)
+
+        sceneFrameBBoxes = numpy.full(fileFrames.shape + (6,), numpy.nan, dtype=numpy.float32)
+
+        valid = (fileFrames >= 0) & (fileFrames < len(frameBBoxes))
+        sceneFrameBBoxes[valid] = frameBBoxes[fileFrames[valid]]
+
+        return sceneFrameBBoxes
+
+
+    def getAnimatedBBox(self, animType, animOffset, speed, frames, voxelFlags=None):
+        return _getBBoxUnion(self.getSceneFrameBBoxes(animType, animOffset, speed, frames, voxelFlags).reshape(-1, 6))
+
+
+    # Metadata only description of the file: per frame voxels with their
+    # bounding boxes and channel layouts, built from the lookup table and
+    # channel headers without reading any channel data. UV set names
+    # additionally read the (small) MAYA_INFO_CHANNEL of the first preview
+    # voxel, unless uvNames is False.
+    #
+    def probe(self, frameIndices=None, uvNames=True):
+        if frameIndices is None:
+            frameIndices = range(len(self.frames))
+
+        def _getChannelInfo(channel):
+            return {
+                'id'                : channel.channelID,
+                'name'              : getChannelName(channel.channelID),
+                'element_size'      : channel.elementSize,
+                'num_elements'      : channel.numElements,
+                'compressed'        : bool(channel.flags & MF_COMPRESSED),
+                'compressed_size'   : channel.dataSize,
+                'uncompressed_size' : channel.getElementsSize(),
+            }
+
+        bbox   = None
+        frames = []
+        uvSets = ()
+
+        for frameIndex in frameIndices:
+            if frameIndex not in self.frames:
+                continue
+
+            voxels = []
+            for voxelInfo in self.frames[frameIndex].voxels:
+                voxel = MeshVoxel(self.meshFile, hasChecksums=self.getHasChecksums(), readGap=self.readGap, readAhead=self.readAhead)
+                voxel.fileOffset = voxelInfo.fileOffset
+                voxel.channels.loadInfo(voxel.fileOffset)
+
+                voxelBBox = voxelInfo.bbox
+                if bbox is None:
+                    bbox = voxelBBox
+                else:
+                    bbox = tuple(min(bbox[i], voxelBBox[i]) for i in range(3)) + tuple(max(bbox[i], voxelBBox[i]) for i in range(3, 6))
+
+                if uvNames and not uvSets and voxelInfo.flags == MVF_PREVIEW_VOXEL:
+                    uvSets = voxel.getUvChannelNames()
+
+                voxels.append({
+                    'flags'        : VoxelFlags.get(voxelInfo.flags, voxelInfo.flags),
+                    'file_offset'  : voxelInfo.fileOffset,
+                    'bbox'         : voxelBBox,
+                    'num_vertices' : voxel.getNumVertices(),
+                    'num_faces'    : voxel.getNumFaces(),
+                    'uv_channels'  : voxel.getUvChannels(),
+                    'channels'     : [_getChannelInfo(channel) for channel in voxel.channels.channels],
+                })
+
+            # Frame counts are for the render geometry, preview voxels excluded
+            geomVoxels = [voxel for voxel in voxels if voxel['flags'] == VoxelFlags[MVF_GEOMETRY_VOXEL]]
+
+            frames.append({
+                'frame'        : frameIndex,
+                'num_vertices' : sum(voxel['num_vertices'] for voxel in geomVoxels),
+                'num_faces'    : sum(voxel['num_faces'] for voxel in geomVoxels),
+                'voxels'       : voxels,
+            })
+
+        return {
+            'path'         : self.filepath,
+            'file_version' : self.fileVersion,
+            'num_frames'   : len(self.frames),
+            'bbox'         : bbox,
+            'uv_sets'      : list(uvSets),
+            'frames'       : frames,
+        }
+
+
+    # Verifies the checksums of every channel in the file, regardless of
+    # verifyChecksums. Voxels stored without checksums are skipped, see
+    # detectVoxelChecksums(). With numThreads > 1 channels are decoded and
+    # checked on the thread pool; inflating, the main cost, releases the GIL.
+    # Returns the number of checked channels and bytes, the number of
+    # skipped voxels and a list of errors.
+    #
+    def verify(self):
+        def _verifyChannel(fileOffset, channel):
+            try:
+                return channel.verifyData(), None
+            except (ChecksumError, zlib.error) as e:
+                return 0, "Voxel at offset %i: %s" % (fileOffset, e)
+
+        numChannels = 0
+        numBytes    = 0
+        numSkipped  = 0
+        errors      = []
+
+        executor = self.getExecutor()
+        results  = []
+
+        hasChecksums = self.getHasChecksums()
+
+        # Voxels referenced by several frames are checked once;
+        # each voxel ends where the next one or the lookup table starts
+        voxelOffsets = sorted(set(self.lookupTable.voxelOffsets))
+        voxelEnds    = voxelOffsets[1:] + [max(self.lookupOffset, voxelOffsets[-1])] if voxelOffsets else []
+
+        for fileOffset, endOffset in zip(voxelOffsets, voxelEnds):
+            channels, voxelHasChecksums = self.detectVoxelChecksums(fileOffset, endOffset, True)
+
+            if channels is None and hasChecksums:
+                errors.append("Voxel at offset %i doesn't match the file's checksum layout" % fileOffset)
+                continue
+
+            if not voxelHasChecksums:
+                numSkipped += 1
+                continue
+
+            for channel in channels.channels:
+                if executor is None:
+                    results.append(_verifyChannel(fileOffset, channel))
+                else:
+                    results.append(executor.submit(_verifyChannel, fileOffset, channel))
+
+        for result in results:
+            channelBytes, error = result if executor is None else result.result()
+
+            numChannels += 1
+            numBytes    += channelBytes
+            if error is not None:
+                errors.append(error)
+
+        return {
+            'channels' : numChannels,
+            'bytes'    : numBytes,
+            'skipped'  : numSkipped,
+            'errors'   : errors,
         }
 
 
+    # Preview meshes for the scene frames frameStart..frameEnd (inclusive).
+    # Every file frame is loaded once, no matter how many scene frames map
+    # to it; 'frame_rows' maps each scene frame to its row in 'vertices'
+    # (-1 if the frame has no preview mesh). 'vertices' is always a float32
+    # (frames, maxVertices, 3) array: rows of frames with fewer vertices are
+    # padded with NaN, 'vertex_counts' holds the valid vertices of each row.
+    # Faces are returned as a single array when the topology of all loaded
+    # frames is identical.
+    #
+    def getPreviewMeshes(self, animType=0, animOffset=0.0, speed=1.0, frameStart=0.0, frameEnd=0.0, frameStep=1.0):
+        _requireNumpy("getPreviewMeshes")
+
+        if frameStep <= 0.0:
+            raise ValueError("frameStep must be positive")
+
+        numSceneFrames = max(floor((frameEnd - frameStart) / frameStep + 1e-6) + 1, 0)
+        sceneFrames    = frameStart + numpy.arange(numSceneFrames) * frameStep
+
+        fileFrames = self.getFramesByType(animType, animOffset, speed, sceneFrames)
+
+        frameIndices = []
+        frameRows    = {}
+        voxels       = []
+        loadFaces    = []
+        uvChannels   = []
+
+        topologyKey  = None
+
+        # Channel headers first: frames with byte identical face channels
+        # share topology without decompressing it again
+        for frameIndex in sorted(set(fileFrames.tolist())):
+            if frameIndex not in self.frames:
+                continue
+
+            voxelInfo = self.getPreviewVoxel(self.frames[frameIndex])
+            if not voxelInfo:
+                continue
+
+            voxel = self.loadVoxel(voxelInfo, useExecutor=False)
+
+            frameTopologyKey = self.getTopologyKey(voxel)
+
+            sameTopology = bool(voxels) and self.isSameTopology(frameTopologyKey, topologyKey)
+            if not sameTopology:
+                topologyKey = frameTopologyKey
+
+            if not frameIndices:
+                uvChannels = voxel.getUvChannelNames()
+
+            frameRows[frameIndex] = len(frameIndices)
+            frameIndices.append(frameIndex)
+            voxels.append(voxel)
+            loadFaces.append(not sameTopology)
+
+        # Then the frames are decoded, in parallel with a thread pool
+        def _decodeFrame(voxel, withFaces):
+            if withFaces:
+                voxel.channels.loadData((VERT_GEOM_CHANNEL, FACE_TOPO_CHANNEL))
+                return voxel.getVertices(OUTPUT_ARRAY), voxel.getFaces(OUTPUT_ARRAY)
+            voxel.channels.loadData((VERT_GEOM_CHANNEL,))
+            return voxel.getVertices(OUTPUT_ARRAY), None
+
+        meshes = self.mapVoxelTasks(_decodeFrame, list(zip(voxels, loadFaces)))
+        voxels = None
+
+        vertices   = []
+        faces      = []
+        sharedTopo = True
+
+        for frameVertices, frameFaces in meshes:
+            if frameFaces is None:
+                frameFaces = faces[-1]
+            elif faces:
+                sharedTopo = sharedTopo and numpy.array_equal(frameFaces, faces[0])
+
+            vertices.append(frameVertices)
+            faces.append(frameFaces)
+
+        meshes = None
+
+        vertexCounts = numpy.array([len(frameVertices) for frameVertices in vertices], dtype=numpy.int64)
+
+        if len(set(vertexCounts.tolist())) == 1:
+            vertices = numpy.stack(vertices)
+        else:
+            paddedVertices = numpy.full((len(vertices), vertexCounts.max(initial=0), 3), numpy.nan, dtype=numpy.float32)
+            for row, frameVertices in enumerate(vertices):
+                paddedVertices[row, :len(frameVertices)] = frameVertices
+            vertices = paddedVertices
+
+        if faces and sharedTopo:
+            faces = faces[0]
+
+        return {
+            'scene_frames'  : sceneFrames,
+            'file_frames'   : fileFrames,
+            'frame_indices' : frameIndices,
+            'frame_rows'    : numpy.array([frameRows.get(f, -1) for f in fileFrames.tolist()], dtype=numpy.int64),
+            'vertices'      : vertices,
+            'vertex_counts' : vertexCounts,
+            'faces'         : faces,
+            'uv_sets'       : uvChannels,
+        }
+
+
+PREFETCH_FRAMES = 8
+
+
+# Decodes upcoming preview frames on a worker thread during playback.
+# getPreviewMesh() maps the scene frame like MeshFile.getPreviewMesh() and
+# then schedules the file frames of the next numFrames scene frames (in
+# steps of direction, negative for reverse playback) into decodedCache.
+# Scheduled frames that leave this window, e.g. after a jump, are
+# cancelled.
+#
+class PreviewPrefetcher(object):
+    def __init__(self, meshFile, animType=0, animOffset=0.0, speed=1.0, direction=1.0, numFrames=PREFETCH_FRAMES):
+        if meshFile.fileKey is None:
+            raise ValueError("Prefetching requires a MeshFile with useCache enabled")
+
+        self.meshFile  = meshFile
+        self.numFrames = numFrames
+
+        self.setPlayback(animType, animOffset, speed, direction)
+
+        # frameIndex -> future of frames in the prefetch window
+        self.pending  = {}
+        self.lock     = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        self.resetStats()
+
+    def setPlayback(self, animType=0, animOffset=0.0, speed=1.0, direction=1.0):
+        self.animType   = animType
+        self.animOffset = animOffset
+        self.speed      = speed
+        self.direction  = direction
+
+    def resetStats(self):
+        # hits: frame was decoded in time, late: still decoding when
+        # requested, misses: not scheduled; stallTime is the time spent in
+        # getPreviewMesh()
+        self.hits      = 0
+        self.late      = 0
+        self.misses    = 0
+        self.scheduled = 0
+        self.cancelled = 0
+        self.stallTime = 0.0
+
+    def getStats(self):
+        numRequests = self.hits + self.late + self.misses
+        return {
+            'hits'       : self.hits,
+            'late'       : self.late,
+            'misses'     : self.misses,
+            'hit_rate'   : self.hits / numRequests if numRequests else 0.0,
+            'scheduled'  : self.scheduled,
+            'cancelled'  : self.cancelled,
+            'stall_time' : self.stallTime,
+        }
+
+    def prefetchFrame(self, frameIndex):
+        voxelInfo = self.meshFile.getPreviewVoxel(self.meshFile.frames[frameIndex])
+        if voxelInfo:
+            self.meshFile.loadVoxel(voxelInfo, (VERT_GEOM_CHANNEL, FACE_TOPO_CHANNEL, MAYA_INFO_CHANNEL))
+
+    def getUpcomingFrames(self, frame):
+        frameIndices = []
+        for i in range(1, self.numFrames + 1):
+            frameIndex = self.meshFile.getFrameByType(self.animType, self.animOffset, self.speed, frame + i * self.direction)
+            if frameIndex in self.meshFile.frames and frameIndex not in frameIndices:
+                frameIndices.append(frameIndex)
+        return frameIndices
+
+    def schedule(self, frame, currentFrameIndex=None):
+        frameIndices = [frameIndex for frameIndex in self.getUpcomingFrames(frame) if frameIndex != currentFrameIndex]
+
+        with self.lock:
+            for frameIndex, future in list(self.pending.items()):
+                if frameIndex not in frameIndices:
+                    if future.cancel():
+                        self.cancelled += 1
+                    del self.pending[frameIndex]
+
+            for frameIndex in frameIndices:
+                if frameIndex not in self.pending:
+                    self.pending[frameIndex] = self.executor.submit(self.prefetchFrame, frameIndex)
+                    self.scheduled += 1
+
+    def getPreviewMesh(self, frame=0.0, output=OUTPUT_TUPLE):
+        startTime = time.perf_counter()
+
+        frameIndex = self.meshFile.getFrameByType(self.animType, self.animOffset, self.speed, frame)
+
+        with self.lock:
+            future = self.pending.pop(frameIndex, None)
+
+        if future is None or future.cancel():
+            self.misses += 1
+        else:
+            if future.done():
+                self.hits += 1
+            else:
+                self.late += 1
+            try:
+                future.result()
+            except Exception:
+                # Errors are raised by the synchronous load below
+                pass
+
+        mesh = self.meshFile.getFramePreviewMesh(frameIndex, output)
+
+        self.stallTime += time.perf_counter() - startTime
+
+        self.schedule(frame, frameIndex)
+
+        return mesh
+
+    def close(self):
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+        self.executor.shutdown(wait=False)
+
+
+def findMeshFiles(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(".vrmesh"):
+                        yield os.path.join(dirpath, filename)
+        else:
+            yield path
+
+
+# Verifies checksums of *.vrmesh files (directories are searched
+# recursively), printing per file results and throughput
+#
+def validateMeshFiles(paths, numThreads=0):
+    numFailed = 0
+
+    for filepath in findMeshFiles(paths):
+        startTime = time.time()
+
+        try:
+            meshFile = MeshFile(filepath, numThreads=numThreads, useCache=False)
+            meshFile.readFile()
+            result = meshFile.verify()
+        except Exception as e:
+            result = {'channels' : 0, 'bytes' : 0, 'skipped' : 0, 'errors' : [str(e)]}
+
+        elapsed = max(time.time() - startTime, 1e-6)
+
+        if result['errors']:
+            numFailed += 1
+        elif not result['channels']:
+            print("%s: SKIPPED, no checksums" % filepath)
+            continue
+
+        print("%s: %s, %i channels, %i voxels without checksums skipped, %.2f MB/s" % (
+            filepath, "FAILED" if result['errors'] else "OK", result['channels'], result['skipped'], result['bytes'] / elapsed / (1024 * 1024)))
+        for error in result['errors']:
+            print("  %s" % error)
+
+    return numFailed
+
+
+# Probes a *.vrmesh file, see MeshFile.probe()
+#
+def probeMeshFile(filepath, frameIndices=None, uvNames=True):
+    meshFile = MeshFile(filepath, useCache=False)
+    meshFile.readFile()
+
+    return meshFile.probe(frameIndices, uvNames)
+
+
 def main():
     global USE_DEBUG
 
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("file", help="*.vrmesh filepath")
+    parser.add_argument("file", help="*.vrmesh filepath (or directory with --verify)")
+    parser.add_argument("--mmap", action='store_true', help="Memory map the file")
+    parser.add_argument("--threads", type=int, default=0, help="Decompression threads")
+    parser.add_argument("--probe", action='store_true', help="Print file metadata as JSON")
+    parser.add_argument("--verify", action='store_true', help="Verify channel checksums")
     args = parser.parse_args()
 
+    if args.verify:
+        sys.exit(1 if validateMeshFiles([args.file], args.threads) else 0)
+
+    if args.probe:
+        import json
+        print(json.dumps(probeMeshFile(args.file), indent=2))
+        return
+
     USE_DEBUG = True
 
-    meshFile = MeshFile(args.file)
+    meshFile = MeshFile(args.file, useMmap=args.mmap, numThreads=args.threads)
     meshFile.readFile()
 
     mesh = meshFile.getPreviewMesh(0)
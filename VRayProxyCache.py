@@ -0,0 +1,239 @@
+#
+# V-Ray Python Tools
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy
+
+if __name__ == '__main__':
+    from VRayProxy import MeshFile, OUTPUT_ARRAY, findMeshFiles
+else:
+    from .VRayProxy import MeshFile, OUTPUT_ARRAY, findMeshFiles
+
+
+PREVIEW_CACHE_SIZE = 2 * 1024 * 1024 * 1024
+
+# Entry files: <key>.json is written last and marks a complete entry
+#
+ENTRY_INFO     = ".json"
+ENTRY_VERTICES = ".vertices.npy"
+ENTRY_FACES    = ".faces.npy"
+
+EntryFiles = (ENTRY_INFO, ENTRY_VERTICES, ENTRY_FACES)
+
+
+# On-disk cache of decoded preview meshes.
+# Vertices and faces are stored as .npy files, so warm loads only memory
+# map them: cached 'vertices' and 'faces' are read-only numpy.memmap
+# arrays. Entries are validated against the source file's size, mtime
+# and lookup table hash; the least recently used entries are removed once
+# the cache grows over maxSize bytes.
+#
+class PreviewCache(object):
+    cacheDir = None
+    maxSize  = None
+    size     = None
+
+    def __init__(self, cacheDir, maxSize=PREVIEW_CACHE_SIZE):
+        self.cacheDir = os.path.expanduser(cacheDir)
+        self.maxSize  = maxSize
+
+        os.makedirs(self.cacheDir, exist_ok=True)
+
+    def getSourceInfo(self, meshFile):
+        fileStat = os.stat(meshFile.filepath)
+        return {
+            'path'        : os.path.realpath(meshFile.filepath),
+            'size'        : fileStat.st_size,
+            'mtime_ns'    : fileStat.st_mtime_ns,
+            'lookup_hash' : meshFile.lookupTableHash,
+        }
+
+    def getEntryPath(self, sourceInfo, frameIndex):
+        pathHash = hashlib.sha1(sourceInfo['path'].encode('utf-8')).hexdigest()
+        return os.path.join(self.cacheDir, "%s_%i" % (pathHash, frameIndex))
+
+    def load(self, meshFile, frameIndex):
+        sourceInfo = self.getSourceInfo(meshFile)
+        entryPath  = self.getEntryPath(sourceInfo, frameIndex)
+
+        try:
+            with open(entryPath + ENTRY_INFO, 'r') as f:
+                entryInfo = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entryInfo.get('source') != sourceInfo:
+            return None
+
+        try:
+            vertices = numpy.load(entryPath + ENTRY_VERTICES, mmap_mode='r')
+            faces    = numpy.load(entryPath + ENTRY_FACES, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+        # Mark as recently used, unless the cache is read-only
+        try:
+            os.utime(entryPath + ENTRY_INFO)
+        except OSError:
+            pass
+
+        # Stored without the file identity, which depends on the MeshFile
+        topologyKey = entryInfo.get('topology_key')
+        if topologyKey is not None:
+            topologyKey = meshFile.makeTopologyKey(*topologyKey)
+
+        return {
+            'vertices'     : vertices,
+            'faces'        : faces,
+            'uv_sets'      : entryInfo['uv_sets'],
+            'topology_key' : topologyKey,
+        }
+
+    # Writes through a unique temporary file that is then moved into place,
+    # so readers and concurrent writers never see partial data
+    #
+    def writeFile(self, filepath, write, mode):
+        fd, tmpPath = tempfile.mkstemp(suffix=".tmp", prefix=os.path.basename(filepath) + ".", dir=self.cacheDir)
+        try:
+            with os.fdopen(fd, mode) as f:
+                write(f)
+            os.replace(tmpPath, filepath)
+        except BaseException:
+            try:
+                os.remove(tmpPath)
+            except OSError:
+                pass
+            raise
+
+    def store(self, meshFile, frameIndex, mesh):
+        sourceInfo = self.getSourceInfo(meshFile)
+        entryPath  = self.getEntryPath(sourceInfo, frameIndex)
+
+        topologyKey = mesh.get('topology_key')
+
+        entryInfo = {
+            'source'       : sourceInfo,
+            'uv_sets'      : list(mesh['uv_sets']),
+            'topology_key' : list(topologyKey[1:]) if topologyKey is not None else None,
+        }
+
+        for suffix, data in ((ENTRY_VERTICES, mesh['vertices']), (ENTRY_FACES, mesh['faces'])):
+            self.writeFile(entryPath + suffix, lambda f: numpy.save(f, data), 'wb')
+
+        self.writeFile(entryPath + ENTRY_INFO, lambda f: json.dump(entryInfo, f), 'w')
+
+        if self.size is not None:
+            self.size += sum(os.path.getsize(entryPath + suffix) for suffix in EntryFiles)
+
+        if self.size is None or self.size > self.maxSize:
+            self.cleanup()
+
+    def getFramePreviewMesh(self, meshFile, frameIndex):
+        mesh = self.load(meshFile, frameIndex)
+        if mesh is not None:
+            return mesh
+
+        mesh = meshFile.getFramePreviewMesh(frameIndex, OUTPUT_ARRAY)
+        if mesh is not None:
+            self.store(meshFile, frameIndex, mesh)
+
+        return mesh
+
+    def getPreviewMesh(self, meshFile, animType=0, animOffset=0.0, speed=1.0, frame=0.0):
+        frameIndex = meshFile.getFrameByType(animType, animOffset, speed, frame)
+
+        return self.getFramePreviewMesh(meshFile, frameIndex)
+
+    def getEntries(self):
+        entries = []
+        for filename in os.listdir(self.cacheDir):
+            if not filename.endswith(ENTRY_INFO):
+                continue
+
+            entryPath = os.path.join(self.cacheDir, filename[:-len(ENTRY_INFO)])
+            try:
+                entryTime = os.path.getmtime(entryPath + ENTRY_INFO)
+                entrySize = sum(os.path.getsize(entryPath + suffix) for suffix in EntryFiles)
+            except OSError:
+                continue
+
+            entries.append((entryTime, entrySize, entryPath))
+        return entries
+
+    def cleanup(self):
+        entries = sorted(self.getEntries())
+
+        self.size = sum(entrySize for entryTime, entrySize, entryPath in entries)
+
+        for entryTime, entrySize, entryPath in entries:
+            if self.size <= self.maxSize:
+                break
+
+            for suffix in EntryFiles:
+                try:
+                    os.remove(entryPath + suffix)
+                except OSError:
+                    pass
+
+            self.size -= entrySize
+
+    def warm(self, filepath):
+        meshFile = MeshFile(filepath, useCache=False)
+        meshFile.readFile()
+
+        numFrames = 0
+        for frameIndex in meshFile.frames:
+            if self.getFramePreviewMesh(meshFile, frameIndex) is not None:
+                numFrames += 1
+
+        return numFrames
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Pre-warm the V-Ray proxy preview cache")
+    parser.add_argument("paths", nargs='+', help="*.vrmesh files or directories")
+    parser.add_argument("--cache-dir", required=True, help="Cache directory")
+    parser.add_argument("--max-size", type=int, default=PREVIEW_CACHE_SIZE // (1024 * 1024), help="Cache size limit in MB")
+    args = parser.parse_args()
+
+    previewCache = PreviewCache(args.cache_dir, args.max_size * 1024 * 1024)
+
+    for filepath in findMeshFiles(args.paths):
+        try:
+            numFrames = previewCache.warm(filepath)
+        except Exception as e:
+            print("Failed to cache \"%s\": %s" % (filepath, e))
+            continue
+        print("Cached \"%s\": %i frames" % (filepath, numFrames))
+
+    previewCache.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,7 @@
 
 __all__ = [
 	'VRayProxy',
+	'VRayProxyCache',
 	'VRaySceneParser',
 	'VrmatParser',
 	'github',
@@ -0,0 +1,100 @@
+# Wall clock of the multi voxel paths (getGeometryMesh, iterGeometryVoxels,
+# getPreviewMeshes) with serial decoding vs. voxels decoded on a thread pool.
+#
+#   python benchmarks/bench_multi_voxel.py [--threads N] [--voxels N] [--vertices N]
+#
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import numpy
+
+import VRayProxy
+
+from conftest import writeMeshFile
+
+
+NUM_FRAMES = 16
+
+
+# Like conftest.makeMeshChannels(), generated with numpy for larger meshes
+#
+def makeMeshChannels(numVertices, numFaces, seed):
+    rand = numpy.random.default_rng(seed)
+
+    # Grid aligned vertices compress roughly like real meshes do
+    vertices = (rand.integers(-1000, 1000, (numVertices, 3)) / 1000.0).astype(numpy.float32)
+    faces    = rand.integers(0, numVertices, (numFaces, 3)).astype(numpy.int32)
+
+    return [
+        (VRayProxy.VERT_GEOM_CHANNEL, 12, vertices.tobytes(), True),
+        (VRayProxy.FACE_TOPO_CHANNEL, 12, faces.tobytes(), True),
+    ]
+
+
+def writeBenchFile(filepath, numVoxels, numVertices):
+    bbox = (-1.0, -1.0, -1.0, 1.0, 1.0, 1.0)
+
+    voxels = []
+    for i in range(numVoxels):
+        voxels.append((VRayProxy.MVF_GEOMETRY_VOXEL, bbox, makeMeshChannels(numVertices, numVertices * 2, i)))
+
+    # Only preview voxels differ between frames, geometry voxels are
+    # written once and referenced by every frame
+    frames = []
+    for frame in range(NUM_FRAMES):
+        frames.append([len(voxels)] + list(range(numVoxels)))
+        voxels.append((VRayProxy.MVF_PREVIEW_VOXEL, bbox, makeMeshChannels(numVertices // 4, numVertices // 2, 1000 + frame)))
+
+    return writeMeshFile(filepath, voxels, frames)
+
+
+def timeCall(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def runBenchmarks(filepath, numThreads):
+    meshFile = VRayProxy.MeshFile(filepath, numThreads=numThreads, useCache=False)
+    meshFile.readFile()
+
+    return {
+        'getGeometryMesh'    : timeCall(lambda: meshFile.getGeometryMesh(0)),
+        'iterGeometryVoxels' : timeCall(lambda: [None for mesh in meshFile.iterGeometryVoxels(0)]),
+        'getPreviewMeshes'   : timeCall(lambda: meshFile.getPreviewMeshes('LOOP', 0.0, 1.0, 0.0, NUM_FRAMES - 1.0)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs. parallel multi voxel decoding")
+    parser.add_argument('--threads',  type=int, default=os.cpu_count() or 1, help="Thread pool size of the parallel run")
+    parser.add_argument('--voxels',   type=int, default=32, help="Geometry voxels per frame")
+    parser.add_argument('--vertices', type=int, default=50000, help="Vertices per geometry voxel")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        filepath = writeBenchFile(os.path.join(tmpDir, "bench.vrmesh"), args.voxels, args.vertices)
+
+        serial   = runBenchmarks(filepath, 0)
+        parallel = runBenchmarks(filepath, args.threads)
+
+    print("%i CPUs, %i threads, %i voxels of %i vertices" % (os.cpu_count() or 1, args.threads, args.voxels, args.vertices))
+    print("%-20s %10s %10s %8s" % ("", "serial", "parallel", "speedup"))
+    for name in serial:
+        print("%-20s %9.1fms %9.1fms %7.2fx" % (name, serial[name] * 1000.0, parallel[name] * 1000.0, serial[name] / parallel[name]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import os
+import random
+import struct
+import sys
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import VRayProxy
+
+
+# Minimal *.vrmesh writer: voxels are lists of
+# (channelID, elementSize, data, compressed) channels, optionally followed
+# by per element CRC32 checksums
+#
+def packVoxel(channels, checksums=False):
+    headers  = b''
+    payloads = b''
+
+    for channelID, elementSize, data, compressed in channels:
+        flags = 0
+        if compressed:
+            flags |= VRayProxy.MF_COMPRESSED
+            compressedData = zlib.compress(data)
+            payloads += struct.pack("I", len(compressedData)) + compressedData
+        else:
+            payloads += data
+
+        if checksums:
+            payloads += b''.join(struct.pack("I", zlib.crc32(data[i:i+elementSize])) for i in range(0, len(data), elementSize))
+
+        headers += VRayProxy.ChannelHeader.pack(elementSize, len(data) // elementSize, channelID, 0, flags)
+
+    return struct.pack("I", len(channels)) + headers + payloads
+
+
+# voxels: (flags, bbox, channels) tuples,
+# frames: lists of indices into voxels
+#
+def writeMeshFile(filepath, voxels, frames, checksums=False):
+    data = bytearray(b'vrmesh\0' + struct.pack("I", 4) + struct.pack("Q", 0))
+
+    voxelOffsets = []
+    for flags, bbox, channels in voxels:
+        voxelOffsets.append(len(data))
+        data += packVoxel(channels, checksums)
+
+    lookupOffset = len(data)
+    for frameVoxels in frames:
+        data += VRayProxy.LookupVoxelCount.pack(len(frameVoxels))
+        for voxelIndex in frameVoxels:
+            flags, bbox, channels = voxels[voxelIndex]
+            data += VRayProxy.LookupVoxelInfo.pack(voxelOffsets[voxelIndex], *bbox, flags)
+    data += VRayProxy.LookupVoxelCount.pack(0)
+
+    data[11:19] = struct.pack("Q", lookupOffset)
+
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+    return filepath
+
+
+def makeMeshChannels(numVertices, numFaces, seed, compressed):
+    rand = random.Random(seed)
+
+    vertices = struct.pack("%if" % (numVertices * 3), *[rand.uniform(-1.0, 1.0) for _ in range(numVertices * 3)])
+    faces    = struct.pack("%ii" % (numFaces * 3), *[rand.randrange(numVertices) for _ in range(numFaces * 3)])
+
+    return [
+        (VRayProxy.VERT_GEOM_CHANNEL, 12, vertices, compressed),
+        (VRayProxy.FACE_TOPO_CHANNEL, 12, faces, compressed),
+    ]
+
+
+# Animated proxy: every frame has a compressed preview voxel and a
+# geometry voxel with an uncompressed normal channel
+#
+@pytest.fixture
+def animatedMeshFile(tmp_path):
+    bbox = (-1.0, -1.0, -1.0, 1.0, 1.0, 1.0)
+
+    voxels = []
+    frames = []
+    for frame in range(12):
+        previewChannels  = makeMeshChannels(200, 300, frame, True)
+        geometryChannels = makeMeshChannels(2000, 3000, 1000 + frame, True)
+        geometryChannels.append((VRayProxy.VERT_NORMAL_CHANNEL, 12, geometryChannels[0][2], False))
+
+        frames.append([len(voxels), len(voxels) + 1])
+        voxels.append((VRayProxy.MVF_PREVIEW_VOXEL, bbox, previewChannels))
+        voxels.append((VRayProxy.MVF_GEOMETRY_VOXEL, bbox, geometryChannels))
+
+    return writeMeshFile(str(tmp_path / "animated.vrmesh"), voxels, frames)
@@ -0,0 +1,91 @@
+import struct
+
+import pytest
+
+import VRayProxy
+
+from conftest import makeMeshChannels, writeMeshFile
+
+
+BBOX = (-1.0, -1.0, -1.0, 1.0, 1.0, 1.0)
+
+
+# Three frames sharing one geometry voxel; with corrupt, the first
+# vertex of every preview voxel doesn't match its checksum
+#
+def writeChecksumFile(filepath, corrupt=False):
+    voxels = []
+    for frame in range(3):
+        voxels.append((VRayProxy.MVF_PREVIEW_VOXEL, BBOX, makeMeshChannels(100, 150, frame, False)))
+    voxels.append((VRayProxy.MVF_GEOMETRY_VOXEL, BBOX, makeMeshChannels(500, 700, 10, True)))
+
+    writeMeshFile(filepath, voxels, [[0, 3], [1, 3], [2, 3]], checksums=True)
+
+    if corrupt:
+        meshFile = VRayProxy.MeshFile(filepath, useCache=False)
+        meshFile.readFile()
+
+        for frameIndex in range(3):
+            voxel   = meshFile.loadVoxel(meshFile.getPreviewVoxel(meshFile.frames[frameIndex]), useCache=False)
+            channel = voxel.channels.getVertGeomChannel()
+
+            with open(filepath, 'r+b') as f:
+                f.seek(channel.dataOffset)
+                f.write(struct.pack("f", 1234.5))
+
+    return filepath
+
+
+def test_cached_data_is_verified(tmp_path):
+    filepath = writeChecksumFile(str(tmp_path / "corrupt.vrmesh"), corrupt=True)
+
+    meshFile = VRayProxy.MeshFile(filepath)
+    meshFile.readFile()
+    meshFile.getFramePreviewMesh(0)
+
+    meshFile = VRayProxy.MeshFile(filepath, verifyChecksums=True)
+    meshFile.readFile()
+
+    with pytest.raises(VRayProxy.ChecksumError):
+        meshFile.getFramePreviewMesh(0)
+
+
+def test_verify(tmp_path):
+    result = VRayProxy.MeshFile(writeChecksumFile(str(tmp_path / "ok.vrmesh")), useCache=False)
+    result.readFile()
+    result = result.verify()
+
+    # Shared geometry voxel is checked once
+    assert result['channels'] == 3 * 2 + 2
+    assert result['skipped'] == 0
+    assert result['errors'] == []
+
+    result = VRayProxy.MeshFile(writeChecksumFile(str(tmp_path / "corrupt.vrmesh"), corrupt=True), useCache=False)
+    result.readFile()
+    result = result.verify()
+
+    assert len(result['errors']) == 3
+    assert all("VERT_GEOM_CHANNEL" in error for error in result['errors'])
+
+
+def test_verify_without_checksums(animatedMeshFile):
+    meshFile = VRayProxy.MeshFile(animatedMeshFile, useCache=False)
+    meshFile.readFile()
+
+    result = meshFile.verify()
+
+    assert result['channels'] == 0
+    assert result['skipped'] == len(meshFile.lookupTable.voxelOffsets)
+    assert result['errors'] == []
+
+
+def test_verify_threads(tmp_path):
+    filepath = writeChecksumFile(str(tmp_path / "corrupt.vrmesh"), corrupt=True)
+
+    results = []
+    for numThreads in (0, 4):
+        meshFile = VRayProxy.MeshFile(filepath, numThreads=numThreads, useCache=False)
+        meshFile.readFile()
+        results.append(meshFile.verify())
+
+    assert results[0] == results[1]
@@ -0,0 +1,70 @@
+import gc
+import random
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import VRayProxy
+
+
+NUM_THREADS = 16
+NUM_LOADS   = 2000
+
+
+def loadFrame(meshFile, frameIndex):
+    frameInfo = meshFile.frames[frameIndex]
+
+    preview  = meshFile.loadVoxel(meshFile.getPreviewVoxel(frameInfo), useCache=False)
+    geometry = meshFile.loadVoxel(meshFile.getGeometryVoxel(frameInfo), useCache=False)
+
+    return (
+        bytes(preview.getVertices(VRayProxy.OUTPUT_BUFFER)),
+        bytes(preview.getFaces(VRayProxy.OUTPUT_BUFFER)),
+        bytes(geometry.getVertices(VRayProxy.OUTPUT_BUFFER)),
+        bytes(geometry.getNormals(VRayProxy.OUTPUT_BUFFER)),
+    )
+
+
+# One open MeshFile serving concurrent frame loads has to return exactly
+# what serial loads return, with either file backend
+#
+@pytest.mark.parametrize("useMmap", [False, True])
+def test_concurrent_loads(animatedMeshFile, useMmap):
+    meshFile = VRayProxy.MeshFile(animatedMeshFile, useMmap=useMmap, numThreads=4, useCache=False)
+    meshFile.readFile()
+
+    expected = [loadFrame(meshFile, frameIndex) for frameIndex in range(len(meshFile.frames))]
+
+    frameIndices = [random.Random(i).randrange(len(meshFile.frames)) for i in range(NUM_LOADS)]
+
+    with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+        results = list(executor.map(lambda frameIndex: loadFrame(meshFile, frameIndex), frameIndices))
+
+    for frameIndex, result in zip(frameIndices, results):
+        assert result == expected[frameIndex], frameIndex
+
+
+# Voxels keep their file handle open after the MeshFile is gone,
+# reads of an explicitly closed handle fail instead of hitting whatever
+# file reused the descriptor
+#
+@pytest.mark.parametrize("useMmap", [False, True])
+def test_handle_lifetime(animatedMeshFile, useMmap):
+    meshFile = VRayProxy.MeshFile(animatedMeshFile, useMmap=useMmap, useCache=False)
+    meshFile.readFile()
+
+    expected = loadFrame(meshFile, 0)[0]
+    voxel    = meshFile.loadVoxel(meshFile.getPreviewVoxel(meshFile.frames[0]), useCache=False)
+
+    del meshFile
+    gc.collect()
+
+    with open(animatedMeshFile, 'rb'):
+        assert bytes(voxel.getVertices(VRayProxy.OUTPUT_BUFFER)) == expected
+
+    fileHandle = voxel.channels.meshFile
+    fileHandle.close()
+
+    with pytest.raises(ValueError):
+        fileHandle.pread(4, 0)
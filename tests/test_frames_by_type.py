@@ -0,0 +1,48 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+import VRayProxy
+
+
+ANIM_TYPES   = sorted(VRayProxy.AnimTypes) + [0, 'UNKNOWN']
+ANIM_OFFSETS = [-13.0, -2.5, 0.0, 0.75, 4.0, 30.0]
+SPEEDS       = [-3.0, -1.0, -0.25, 0.5, 1.0, 2.5]
+SCENE_FRAMES = numpy.arange(-40.0, 40.0, 0.37)
+
+
+@pytest.fixture
+def meshFile(animatedMeshFile):
+    meshFile = VRayProxy.MeshFile(animatedMeshFile, useCache=False)
+    meshFile.readFile()
+    return meshFile
+
+
+@pytest.mark.parametrize("animType", ANIM_TYPES)
+def test_scalar_parity(meshFile, animType):
+    for animOffset in ANIM_OFFSETS:
+        for speed in SPEEDS:
+            frames   = meshFile.getFramesByType(animType, animOffset, speed, SCENE_FRAMES)
+            expected = [meshFile.getFrameByType(animType, animOffset, speed, frame) for frame in SCENE_FRAMES.tolist()]
+
+            assert frames.tolist() == expected, (animType, animOffset, speed)
+
+
+def test_per_proxy_arrays(meshFile):
+    animTypes   = numpy.array([0, 'LOOP', 'ONCE', '2', 'STILL'], dtype=object).reshape(-1, 1)
+    animOffsets = numpy.array([1.5, -4.0, 2.0, 7.25, 3.0]).reshape(-1, 1)
+    speeds      = numpy.array([1.0, -2.0, 0.5, 1.5, 1.0]).reshape(-1, 1)
+
+    frames = meshFile.getFramesByType(animTypes, animOffsets, speeds, SCENE_FRAMES)
+
+    assert frames.shape == (len(animTypes), len(SCENE_FRAMES))
+
+    for row, (animType, animOffset, speed) in enumerate(zip(animTypes[:, 0], animOffsets[:, 0], speeds[:, 0])):
+        expected = [meshFile.getFrameByType(animType, animOffset, speed, frame) for frame in SCENE_FRAMES.tolist()]
+        assert frames[row].tolist() == expected, animType
+
+
+def test_mixed_type_list(meshFile):
+    frames = meshFile.getFramesByType([0, 'LOOP'], 0.0, 1.0, 15.0)
+
+    assert frames.tolist() == [meshFile.getFrameByType(0, 0.0, 1.0, 15.0), meshFile.getFrameByType('LOOP', 0.0, 1.0, 15.0)]
@@ -0,0 +1,62 @@
+import tracemalloc
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+import VRayProxy
+
+from conftest import makeMeshChannels, writeMeshFile
+
+
+BBOX = (-1.0, -1.0, -1.0, 1.0, 1.0, 1.0)
+
+# zlib's inflate state and small per voxel objects, not part of the budget
+INFLATE_OVERHEAD = 128 * 1024
+
+
+@pytest.fixture
+def meshFile(tmp_path):
+    voxels = [(VRayProxy.MVF_GEOMETRY_VOXEL, BBOX, makeMeshChannels(20000, 30000, seed, True)) for seed in range(4)]
+
+    meshFile = VRayProxy.MeshFile(writeMeshFile(str(tmp_path / "voxels.vrmesh"), voxels, [[0, 1, 2, 3]]), useCache=False)
+    meshFile.readFile()
+    return meshFile
+
+
+def getVoxelBudget(meshFile):
+    decodedSize = 0
+    rawSize     = 0
+    for voxelInfo in meshFile.getGeometryVoxels(meshFile.frames[0]):
+        voxel    = meshFile.loadVoxel(voxelInfo, useCache=False)
+        channels = [voxel.channels.getVertGeomChannel(), voxel.channels.getFaceTopoChannel()]
+
+        decodedSize = max(decodedSize, sum(channel.getElementsSize() for channel in channels))
+        rawSize     = max(rawSize, max(channel.dataSize for channel in channels))
+
+    # Previous and current voxel arrays and the largest raw payload
+    return 2 * decodedSize + rawSize
+
+
+def test_iter_max_memory(meshFile):
+    maxMemory = getVoxelBudget(meshFile)
+
+    tracemalloc.start()
+    try:
+        numVoxels = 0
+        for mesh in meshFile.iterGeometryVoxels(0, maxMemory):
+            numVoxels += 1
+        mesh = None
+
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert numVoxels == 4
+    assert peak <= maxMemory + INFLATE_OVERHEAD, peak
+
+
+def test_iter_over_budget(meshFile):
+    with pytest.raises(MemoryError):
+        for mesh in meshFile.iterGeometryVoxels(0, getVoxelBudget(meshFile) - 1):
+            pass
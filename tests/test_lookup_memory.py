@@ -0,0 +1,47 @@
+import tracemalloc
+
+import VRayProxy
+
+from conftest import makeMeshChannels, writeMeshFile
+
+
+NUM_FRAMES = 10000
+NUM_VOXELS = 2 * NUM_FRAMES
+
+# Lookup table columns: per frame voxel start and count, per voxel
+# offset, bbox and flags; the raw table read only adds to the peak
+COLUMNS_SIZE   = NUM_FRAMES * 8 + NUM_VOXELS * 36
+RAW_TABLE_SIZE = (NUM_FRAMES + 1) * VRayProxy.LookupVoxelCount.size + NUM_VOXELS * VRayProxy.LookupVoxelInfo.size
+
+
+# Headroom for array over-allocation and the MeshFile objects
+#
+def getBudget(size):
+    return int(size * 1.25) + 64 * 1024
+
+
+RETAINED_BUDGET = getBudget(COLUMNS_SIZE)
+PEAK_BUDGET     = getBudget(COLUMNS_SIZE + RAW_TABLE_SIZE)
+
+
+def test_lookup_table_budget(tmp_path):
+    voxels = []
+    for flags in (VRayProxy.MVF_PREVIEW_VOXEL, VRayProxy.MVF_GEOMETRY_VOXEL):
+        voxels.append((flags, (-1.0, -1.0, -1.0, 1.0, 1.0, 1.0), makeMeshChannels(3, 1, 0, False)))
+
+    filepath = writeMeshFile(str(tmp_path / "frames.vrmesh"), voxels, [[0, 1]] * NUM_FRAMES)
+
+    tracemalloc.start()
+    try:
+        meshFile = VRayProxy.MeshFile(filepath)
+        meshFile.readFile()
+
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(meshFile.frames) == NUM_FRAMES
+    assert meshFile.frames[NUM_FRAMES - 1].numVoxels == 2
+
+    assert retained <= RETAINED_BUDGET, retained
+    assert peak <= PEAK_BUDGET, peak
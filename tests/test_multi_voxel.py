@@ -0,0 +1,72 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+import VRayProxy
+
+from conftest import makeMeshChannels, writeMeshFile
+
+
+NUM_FRAMES = 6
+NUM_VOXELS = 8
+
+
+# Frames of several geometry voxels; every other preview voxel repeats
+# the previous topology
+#
+@pytest.fixture
+def multiVoxelFile(tmp_path):
+    voxels = []
+    frames = []
+    for frame in range(NUM_FRAMES):
+        previewChannels = makeMeshChannels(100, 150, frame // 2, True)
+        previewChannels[0] = makeMeshChannels(100, 150, 100 + frame, True)[0]
+
+        frameVoxels = [len(voxels)]
+        voxels.append((VRayProxy.MVF_PREVIEW_VOXEL, (-1.0, -1.0, -1.0, 1.0, 1.0, 1.0), previewChannels))
+
+        for i in range(NUM_VOXELS):
+            bbox = (float(i), -1.0, -1.0, i + 1.0, 1.0, 1.0)
+            frameVoxels.append(len(voxels))
+            voxels.append((VRayProxy.MVF_GEOMETRY_VOXEL, bbox, makeMeshChannels(300 + 10 * i, 400, 1000 * frame + i, True)))
+
+        frames.append(frameVoxels)
+
+    return writeMeshFile(str(tmp_path / "voxels.vrmesh"), voxels, frames)
+
+
+def openMeshFile(filepath, numThreads):
+    meshFile = VRayProxy.MeshFile(filepath, numThreads=numThreads, useCache=False)
+    meshFile.readFile()
+    return meshFile
+
+
+# Decoding voxels as thread pool tasks returns exactly the serial results
+#
+def test_parallel_parity(multiVoxelFile):
+    serial   = openMeshFile(multiVoxelFile, 0)
+    parallel = openMeshFile(multiVoxelFile, 4)
+
+    for frameIndex in range(NUM_FRAMES):
+        expected = serial.getGeometryMesh(frameIndex)
+        result   = parallel.getGeometryMesh(frameIndex)
+
+        assert numpy.array_equal(result['vertices'], expected['vertices'])
+        assert numpy.array_equal(result['faces'], expected['faces'])
+
+        expected = list(serial.iterGeometryVoxels(frameIndex))
+        result   = list(parallel.iterGeometryVoxels(frameIndex))
+
+        assert [mesh['index'] for mesh in result] == list(range(NUM_VOXELS))
+        for mesh, expectedMesh in zip(result, expected):
+            assert numpy.array_equal(mesh['vertices'], expectedMesh['vertices'])
+            assert numpy.array_equal(mesh['faces'], expectedMesh['faces'])
+
+    expected = serial.getPreviewMeshes('LOOP', 0.0, 1.0, 0.0, NUM_FRAMES - 1.0)
+    result   = parallel.getPreviewMeshes('LOOP', 0.0, 1.0, 0.0, NUM_FRAMES - 1.0)
+
+    assert numpy.array_equal(result['vertices'], expected['vertices'])
+    assert len(result['faces']) == NUM_FRAMES
+    for faces, expectedFaces in zip(result['faces'], expected['faces']):
+        assert numpy.array_equal(faces, expectedFaces)
+    assert result['faces'][0] is result['faces'][1]
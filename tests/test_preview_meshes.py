@@ -0,0 +1,28 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+import VRayProxy
+
+
+@pytest.fixture
+def meshFile(animatedMeshFile):
+    meshFile = VRayProxy.MeshFile(animatedMeshFile, useCache=False)
+    meshFile.readFile()
+    return meshFile
+
+
+@pytest.mark.parametrize("frameStart, frameEnd, numFrames", [(5.0, 4.5, 0), (5.0, 3.0, 0), (5.0, 5.0, 1), (0.0, 2.0, 3)])
+def test_frame_range(meshFile, frameStart, frameEnd, numFrames):
+    meshes = meshFile.getPreviewMeshes('LOOP', 0.0, 1.0, frameStart, frameEnd)
+
+    assert len(meshes['scene_frames']) == numFrames
+    assert meshes['vertices'].shape[0] == numFrames
+
+
+def test_vertices_match(meshFile):
+    meshes = meshFile.getPreviewMeshes('LOOP', 0.0, 1.0, 0.0, 3.0)
+
+    for frameIndex, row in zip(meshes['file_frames'].tolist(), meshes['frame_rows'].tolist()):
+        vertices = meshes['vertices'][row, :meshes['vertex_counts'][row]]
+        assert numpy.array_equal(vertices, meshFile.getFramePreviewMesh(frameIndex, VRayProxy.OUTPUT_ARRAY)['vertices'])